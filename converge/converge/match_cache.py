@@ -0,0 +1,80 @@
+"""
+Cached match_project responses.
+
+Entries are keyed by project, a digest of the project embedding, top_n and the
+candidate pool, plus two version counters: one per project and one shared by
+every project. Writes that change match inputs bump a counter instead of deleting
+keys (the cache cannot enumerate them), so stale entries are simply never read
+again and expire on TTL.
+
+The cache is best effort: if the backend is unreachable or unwritable, errors
+are logged and matching runs uncached rather than failing the request.
+"""
+import hashlib
+import logging
+import time
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+MATCH_CACHE_TTL = 300  # seconds
+_GLOBAL_VERSION_KEY = "match:version"
+
+
+def _project_version_key(project_id):
+	return f"match:version:{project_id}"
+
+
+def match_cache_key(project_id, proj_emb, top_n, candidate_pool):
+	"""Cache key for a match response (proj_emb is the float32 project embedding), or None if the cache is unavailable."""
+	digest = hashlib.blake2b(proj_emb.tobytes(), digest_size=16).hexdigest()
+	version_keys = (_GLOBAL_VERSION_KEY, _project_version_key(project_id))
+	try:
+		versions = cache.get_many(version_keys)
+		for key in version_keys:
+			if key not in versions:
+				# Seed with a timestamp so an evicted counter never revives old entries
+				cache.add(key, time.time_ns(), timeout=None)
+				versions[key] = cache.get(key)
+	except Exception as e:
+		logger.warning(f"[match_cache] Cache unavailable, matching uncached: {e}")
+		return None
+	return f"match:{project_id}:{versions[version_keys[0]]}:{versions[version_keys[1]]}:{digest}:{top_n}:{candidate_pool}"
+
+
+def get_cached_match(cache_key):
+	"""Cached match payload for cache_key, or None on a miss or cache error."""
+	try:
+		return cache.get(cache_key)
+	except Exception as e:
+		logger.warning(f"[match_cache] Cache read failed: {e}")
+		return None
+
+
+def cache_match(cache_key, payload):
+	try:
+		cache.set(cache_key, payload, MATCH_CACHE_TTL)
+	except Exception as e:
+		logger.warning(f"[match_cache] Cache write failed: {e}")
+
+
+def _bump(key):
+	try:
+		try:
+			cache.incr(key)
+		except ValueError:
+			cache.set(key, time.time_ns(), timeout=None)
+	except Exception as e:
+		# Entries for this key then live until MATCH_CACHE_TTL expires
+		logger.warning(f"[match_cache] Could not invalidate {key}: {e}")
+
+
+def invalidate_all_matches():
+	"""Drop cached matches for every project (resume or rating changed) once the transaction commits."""
+	transaction.on_commit(lambda: _bump(_GLOBAL_VERSION_KEY), robust=True)
+
+
+def invalidate_project_matches(project_id):
+	"""Drop cached matches for one project (its JSON or embedding changed) once the transaction commits."""
+	transaction.on_commit(lambda: _bump(_project_version_key(project_id)), robust=True)
@@ -0,0 +1,23 @@
+"""
+orjson-backed encoder/decoder for JSONField.
+
+Django calls json.dumps(value, cls=encoder) and json.loads(value, cls=decoder);
+overriding encode/decode routes both through orjson, which is several times
+faster on large resume/project documents and 768-float embedding lists.
+"""
+import json
+import orjson
+from django.core.serializers.json import DjangoJSONEncoder
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+class OrjsonEncoder(DjangoJSONEncoder):
+	def encode(self, o):
+		return orjson.dumps(o, default=self.default, option=ORJSON_OPTIONS).decode()
+
+
+class OrjsonDecoder(json.JSONDecoder):
+	def decode(self, s, _w=None):
+		# orjson.JSONDecodeError subclasses json.JSONDecodeError, which JSONField handles
+		return orjson.loads(s)
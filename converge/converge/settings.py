@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 from decouple import config
 
@@ -108,6 +109,86 @@ DATABASES = {
 }
 
 
+# Rank resumes in Postgres with pgvector (HNSW over resume_vectors.ResumeVector)
+# instead of scoring every embedding in Python. Requires the vector extension 0.7+;
+# the resume_vectors app, and with it the extension, table and index, is only
+# installed and migrated when this is on. Its migration backfills existing resumes;
+# after running with it off, re-run that backfill (migrate resume_vectors zero, then
+# migrate) so resumes embedded in the meantime are searchable.
+MATCH_USE_PGVECTOR = config('MATCH_USE_PGVECTOR', default=False, cast=bool)
+if MATCH_USE_PGVECTOR:
+    INSTALLED_APPS.append('resume_vectors')
+
+# Otherwise rank resumes with a FAISS HNSW index kept in each worker process and
+# persisted under MATCH_FAISS_INDEX_DIR (see projects/services.py). Requires faiss.
+MATCH_USE_FAISS = config('MATCH_USE_FAISS', default=False, cast=bool)
+MATCH_FAISS_INDEX_DIR = config('MATCH_FAISS_INDEX_DIR', default=os.path.join(tempfile.gettempdir(), 'converge_faiss'))
+
+# Otherwise scan ResumeEmbedding.embedding_i8 (int8-quantized) instead of the float32
+# copies; resumes near the semantic gate are rescored in float32.
+MATCH_GATE_INT8 = config('MATCH_GATE_INT8', default=False, cast=bool)
+
+# Otherwise run the float32 scan on a CUDA device with CuPy, keeping the resume
+# matrix resident in GPU memory between requests. Requires cupy and a CUDA device;
+# without either the CPU scan is used.
+MATCH_USE_GPU = config('MATCH_USE_GPU', default=False, cast=bool)
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Set REDIS_URL to share the cache across worker processes and hosts (requires the
+# redis package); otherwise a file-based cache in CACHE_DIR is shared by processes on
+# this host. CACHE_DIR defaults to the system temp directory, which is writable even
+# when the app runs as an unprivileged user over a read-only code directory.
+
+REDIS_URL = config('REDIS_URL', default='')
+CACHE_DIR = config('CACHE_DIR', default=os.path.join(tempfile.gettempdir(), 'converge_cache'))
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_DIR,
+        }
+    }
+
+
+# Logging
+# https://docs.djangoproject.com/en/5.2/topics/logging/
+# Application loggers (matching, parsing, ratings, background tasks) write to the
+# console at LOG_LEVEL. Per-resume traces are DEBUG; use WARNING in production so
+# the matching hot path emits no records at all.
+
+LOG_LEVEL = config('LOG_LEVEL', default='INFO').upper()
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'simple': {
+            'format': '%(asctime)s %(levelname)s %(name)s %(message)s',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'simple',
+        },
+    },
+    'loggers': {
+        name: {'handlers': ['console'], 'level': LOG_LEVEL, 'propagate': False}
+        for name in ('projects', 'resumes', 'ratings', 'external')
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
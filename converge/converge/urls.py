@@ -15,6 +15,8 @@ urlpatterns = [
 	path("admin/", admin.site.urls),
 	path("health/", core_views.health_check, name="health-check"),
 	path("health", core_views.health_check, name="health-check-no-slash"),
+	path("health/live/", core_views.health_live, name="health-live"),
+	path("health/ready/", core_views.health_check, name="health-ready"),
 	path("api/", core_views.api_info, name="api-info"),
 	path("api/resume/", include("resumes.urls")),
 	path("api/project/", include("projects.urls")),
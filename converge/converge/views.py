@@ -1,19 +1,46 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from django.db import connection
+import time
+
+# Seconds a database probe result is reused by readiness checks
+DB_CHECK_TTL = 5.0
+_LAST_DB_CHECK = (0.0, "unknown")  # (time.monotonic() of probe, status)
+
+
+def _database_status():
+	"""Probe the database at most once per DB_CHECK_TTL seconds."""
+	global _LAST_DB_CHECK
+	checked_at, db_status = _LAST_DB_CHECK
+	if time.monotonic() - checked_at > DB_CHECK_TTL:
+		try:
+			# Test database connection
+			connection.ensure_connection()
+			db_status = "connected"
+		except Exception as e:
+			db_status = f"error: {str(e)}"
+		_LAST_DB_CHECK = (time.monotonic(), db_status)
+	return db_status
+
+
+@api_view(['GET'])
+def health_live(request):
+	"""
+	Liveness probe: the process is up and serving requests. Never touches the database.
+	"""
+	return Response({
+		"status": "alive",
+		"service": "Converge Embedding & Matching API"
+	})
 
 
 @api_view(['GET'])
 def health_check(request):
 	"""
-	Health check endpoint for server monitoring.
+	Health check (readiness) endpoint for server monitoring.
+	The database probe result is cached for DB_CHECK_TTL seconds.
 	"""
-	try:
-		# Test database connection
-		connection.ensure_connection()
-		db_status = "connected"
-	except Exception as e:
-		db_status = f"error: {str(e)}"
+	db_status = _database_status()
 	
 	return Response({
 		"status": "healthy" if db_status == "connected" else "unhealthy",
@@ -33,6 +60,7 @@ def api_info(request):
 		"description": "Generates embeddings and performs candidate matching",
 		"endpoints": {
 			"resume_embed": "POST /api/resume/embed/ - Generate resume embedding",
+			"resume_status": "GET /api/resume/{resume_id}/status/ - Background embedding status",
 			"project_embed": "POST /api/project/embed/ - Generate project embedding",
 			"project_match": "POST /api/project/match/{project_id}/?top=5 - Match candidates to project"
 		},
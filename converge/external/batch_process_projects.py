@@ -1,8 +1,11 @@
 import os
 import sys
 import json
+import asyncio
 from pathlib import Path
 from process_project import process_project
+from external.semantic_project import build_semantic_text_project
+from external.embed_project import embed_many_project
 
 # -------- CONFIG --------
 SUPPORTED_FORMATS = [".json"]
@@ -49,18 +52,30 @@ def batch_process_projects(directory_path):
         "errors": []
     }
     
-    # Process each JSON
-    for idx, json_path in enumerate(json_files, 1):
+    # Load every project JSON up front so all embeddings go out in batched requests
+    loaded = []
+    for json_path in json_files:
         filename = os.path.basename(json_path)
-        print(f"[{idx}/{len(json_files)}] Processing: {filename}")
-        
         try:
-            # Load project JSON
             with open(json_path, "r") as f:
-                project_json = json.load(f)
-            
+                loaded.append((filename, json.load(f)))
+        except Exception as e:
+            results["failed"] += 1
+            results["errors"].append(f"{filename}: {str(e)}")
+            print(f"❌ Failed to load {filename}: {str(e)}")
+    
+    print(f"🧠 Generating embeddings for {len(loaded)} projects...")
+    embeddings = asyncio.run(embed_many_project(
+        [build_semantic_text_project(project_json) for _, project_json in loaded]
+    ))
+    
+    # Process each JSON
+    for idx, ((filename, project_json), embedding) in enumerate(zip(loaded, embeddings), 1):
+        print(f"[{idx}/{len(loaded)}] Processing: {filename}")
+        
+        try:
             # Process project
-            project_record = process_project(project_json)
+            project_record = process_project(project_json, embedding=embedding)
             results["successful"] += 1
             results["processed_projects"].append(project_record["project_id"])
             print(f"    ✅ Success\n")
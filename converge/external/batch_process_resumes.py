@@ -1,11 +1,95 @@
 import os
 import sys
-import json
-from pathlib import Path
-from process_resume import process_resume
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from process_resume import save_resume_batch
+from external.ocr1 import extract_text_from_pdf
+from external.parse_resume import aparse_resume, PARSE_CONCURRENCY
+from external.semantic import build_semantic_text
+from external.embed_resume import embed_many
+from external.match_users_to_projects import normalize_skills
 
 # -------- CONFIG --------
 SUPPORTED_FORMATS = [".pdf"]
+OCR_WORKERS = 4         # PDFs rasterized/OCR'd at once (CPU-bound, off the event loop)
+EMBED_FLUSH_SIZE = 32   # parsed resumes embedded and written to storage together
+
+# -------- PIPELINE --------
+async def _run_pipeline(pdf_files, results):
+    """
+    OCR → parse → embed as three overlapping stages joined by queues, so one
+    resume's OCR runs while others wait on Gemini or are being embedded.
+    Wall-clock tends to the slowest stage rather than the sum of all three.
+    """
+    loop = asyncio.get_running_loop()
+    parse_q = asyncio.Queue()
+    embed_q = asyncio.Queue()
+    semaphore = asyncio.Semaphore(PARSE_CONCURRENCY)
+
+    def fail(pdf_path, stage, e):
+        filename = os.path.basename(pdf_path)
+        results["failed"] += 1
+        results["errors"].append(f"{filename}: {str(e)}")
+        print(f"❌ Failed to {stage} {filename}: {str(e)}")
+
+    async def ocr_stage(executor):
+        async def ocr_one(pdf_path):
+            try:
+                resume_text = await loop.run_in_executor(executor, extract_text_from_pdf, pdf_path)
+            except Exception as e:
+                fail(pdf_path, "extract", e)
+                return
+            await parse_q.put((pdf_path, resume_text))
+
+        await asyncio.gather(*(ocr_one(pdf_path) for pdf_path in pdf_files))
+        for _ in range(PARSE_CONCURRENCY):
+            await parse_q.put(None)
+
+    async def parse_worker():
+        while (item := await parse_q.get()) is not None:
+            pdf_path, resume_text = item
+            try:
+                resume_json = await aparse_resume(resume_text, semaphore)
+                resume_json["_skills_norm"] = normalize_skills(resume_json.get("skills", {}))
+            except Exception as e:
+                fail(pdf_path, "parse", e)
+                continue
+            print(f"🔍 Parsed {os.path.basename(pdf_path)}")
+            await embed_q.put((pdf_path, resume_json))
+
+    async def parse_stage():
+        await asyncio.gather(*(parse_worker() for _ in range(PARSE_CONCURRENCY)))
+        await embed_q.put(None)
+
+    async def flush(batch):
+        try:
+            embeddings = await embed_many([build_semantic_text(resume_json) for _, resume_json in batch])
+            # Whole-file JSON/.npy rewrites; off the event loop so OCR and parsing keep running
+            user_records = await asyncio.to_thread(save_resume_batch, [
+                (pdf_path, resume_json, embedding)
+                for (pdf_path, resume_json), embedding in zip(batch, embeddings)
+            ])
+        except Exception as e:
+            for pdf_path, _ in batch:
+                fail(pdf_path, "embed", e)
+            return
+        for (pdf_path, _), user_record in zip(batch, user_records):
+            results["successful"] += 1
+            results["processed_users"].append(user_record["user_id"])
+            print(f"    ✅ {os.path.basename(pdf_path)} → {user_record['user_id']}")
+
+    async def embed_stage():
+        batch = []
+        while (item := await embed_q.get()) is not None:
+            batch.append(item)
+            if len(batch) >= EMBED_FLUSH_SIZE:
+                await flush(batch)
+                batch = []
+        if batch:
+            await flush(batch)
+
+    with ThreadPoolExecutor(max_workers=OCR_WORKERS) as executor:
+        await asyncio.gather(ocr_stage(executor), parse_stage(), embed_stage())
 
 # -------- BATCH PROCESSOR --------
 def batch_process_resumes(directory_path):
@@ -49,22 +133,7 @@ def batch_process_resumes(directory_path):
         "errors": []
     }
     
-    # Process each PDF
-    for idx, pdf_path in enumerate(pdf_files, 1):
-        filename = os.path.basename(pdf_path)
-        print(f"[{idx}/{len(pdf_files)}] Processing: {filename}")
-        
-        try:
-            user_record = process_resume(pdf_path)
-            results["successful"] += 1
-            results["processed_users"].append(user_record["user_id"])
-            print(f"    ✅ Success\n")
-        
-        except Exception as e:
-            results["failed"] += 1
-            error_msg = f"{filename}: {str(e)}"
-            results["errors"].append(error_msg)
-            print(f"    ❌ Failed: {str(e)}\n")
+    asyncio.run(_run_pipeline(pdf_files, results))
     
     # Print summary
     print(f"\n{'='*70}")
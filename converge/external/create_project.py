@@ -1,5 +1,6 @@
 import os
 import json
+import re
 import uuid
 from datetime import datetime
 
@@ -16,6 +17,9 @@ PROJECT_SCHEMA = {
     "created_at": ""
 }
 
+# Non-blank, whitespace-trimmed items of a comma-separated list
+LIST_ITEM_RE = re.compile(r"[^,\s](?:[^,]*[^,\s])?")
+
 # -------- PROJECT CREATOR --------
 def create_project_json(
     title: str,
@@ -90,17 +94,17 @@ def input_project_interactively() -> dict:
     # Get required skills
     print("\n🎯 Required Skills (comma-separated):")
     required_skills_input = input("Skills: ").strip()
-    required_skills = [s.strip() for s in required_skills_input.split(",") if s.strip()]
+    required_skills = LIST_ITEM_RE.findall(required_skills_input)
     
     # Get preferred technologies
     print("\n💻 Preferred Technologies (comma-separated):")
     tech_input = input("Technologies: ").strip()
-    preferred_technologies = [t.strip() for t in tech_input.split(",") if t.strip()]
+    preferred_technologies = LIST_ITEM_RE.findall(tech_input)
     
     # Get domains
     print("\n🌐 Domains (comma-separated):")
     domains_input = input("Domains: ").strip()
-    domains = [d.strip() for d in domains_input.split(",") if d.strip()]
+    domains = LIST_ITEM_RE.findall(domains_input)
     
     # Get project type
     print("\n📂 Project Type:")
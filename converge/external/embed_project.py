@@ -1,51 +1,28 @@
-import os
-import django
-from google.genai import Client
-from google.genai import types
+import numpy as np
+from external.embed_texts import EMBED_CONCURRENCY, aembed_texts, embed_texts
 
-# Configure Django if not already configured
-if not django.apps.apps.ready:
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'converge.settings')
-    django.setup()
+# Resume and project embeddings share one model, cache and client (external/embed_texts.py)
+LOG_PREFIX = "embed_project"
 
-from django.conf import settings
+def embed_semantic_texts_project_batch(texts: list) -> np.ndarray:
+    """
+    Converts a list of semantic texts into an (N, 768) float32 embedding matrix in as few API calls as possible.
+    Empty texts map to zero rows; previously seen texts are served from the embedding cache.
+    """
+    return embed_texts(texts, LOG_PREFIX)
 
-# Configure Google Generative AI
-EMBEDDING_MODEL = "models/text-embedding-004"
-api_key = settings.GEMINI_API_KEY
-if not api_key:
-    raise ValueError("GEMINI_API_KEY not configured in settings")
-client = Client(api_key=api_key)
+async def embed_many_project(texts: list, concurrency: int = EMBED_CONCURRENCY) -> np.ndarray:
+    """
+    Async embed_semantic_texts_project_batch for bulk ingestion: cache misses go out as up to `concurrency`
+    overlapping requests. Call as asyncio.run(embed_many_project(texts)).
+    """
+    return await aembed_texts(texts, LOG_PREFIX, concurrency)
 
-# -------- EMBEDDING FUNCTION --------
-def embed_semantic_text_project(text: str) -> list:
+def embed_semantic_text_project(text: str) -> np.ndarray:
     """
-    Converts semantic text into a 768-dim embedding vector using Google's embedding model.
+    Converts semantic text into a 768-dim float32 embedding vector using Google's embedding model.
     """
-    if not text:
-        return [0.0] * 768
-    
-    try:
-        config = types.EmbedContentConfig(
-            task_type="RETRIEVAL_DOCUMENT",
-        )
-        result = client.models.embed_content(
-            model=EMBEDDING_MODEL,
-            contents=text,
-            config=config,
-        )
-        # Extract embedding: result.embeddings is a list of ContentEmbedding objects
-        # Each ContentEmbedding has a 'values' attribute with the vector
-        if hasattr(result, 'embeddings') and result.embeddings:
-            embedding = list(result.embeddings[0].values)
-        else:
-            raise ValueError(f"Unexpected response structure: {result}")
-        
-        print(f"[embed_project] Generated Google embedding (dim={len(embedding)})")
-        return embedding
-    except Exception as e:
-        print(f"[embed_project] ❌ Error generating embedding: {str(e)}")
-        raise
+    return embed_semantic_texts_project_batch([text])[0]
 
 # -------- RUNNER --------
 if __name__ == "__main__":
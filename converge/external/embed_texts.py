@@ -0,0 +1,125 @@
+import os
+import asyncio
+import django
+import numpy as np
+from external.embedding_cache import get_embedder
+from external.genai_client import get_client
+from external.embedding_store import EMBEDDING_DIM
+
+# Configure Django if not already configured
+if not django.apps.apps.ready:
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'converge.settings')
+    django.setup()
+
+from django.conf import settings
+
+# Configure Google Generative AI
+EMBEDDING_MODEL = "models/text-embedding-004"
+EMBED_BATCH_SIZE = 100  # max texts per embed_content request
+EMBED_CONCURRENCY = 8   # embed_content requests in flight for async bulk ingestion
+EMBEDDING_CACHE_PATH = settings.BASE_DIR / "embedding_cache.sqlite3"
+_EMBED_CONFIG = {"task_type": "RETRIEVAL_DOCUMENT"}
+
+def _client():
+    """Shared genai client, created on the first embedding request."""
+    api_key = settings.GEMINI_API_KEY
+    if not api_key:
+        raise ValueError("GEMINI_API_KEY not configured in settings")
+    return get_client(api_key)
+
+def _embeddings_from(result, chunk: list) -> list:
+    # result.embeddings is a list of ContentEmbedding objects, one per input text and in the same order
+    if not getattr(result, 'embeddings', None) or len(result.embeddings) != len(chunk):
+        raise ValueError(f"Unexpected response structure: {result}")
+    return [list(content_embedding.values) for content_embedding in result.embeddings]
+
+# -------- EMBEDDING FUNCTION --------
+def _fetch_embeddings(texts: list, model: str, log_prefix: str) -> list:
+    """
+    Requests embeddings for non-empty texts from Google's embedding model, EMBED_BATCH_SIZE texts per call.
+    """
+    embeddings = []
+    for start in range(0, len(texts), EMBED_BATCH_SIZE):
+        chunk = texts[start:start + EMBED_BATCH_SIZE]
+        result = _client().models.embed_content(model=model, contents=chunk, config=_EMBED_CONFIG)
+        embeddings.extend(_embeddings_from(result, chunk))
+
+    print(f"[{log_prefix}] Generated {len(embeddings)} Google embedding(s) (dim={len(embeddings[0])})")
+    return embeddings
+
+async def _afetch_embeddings(texts: list, concurrency: int, model: str, log_prefix: str) -> list:
+    """
+    Async _fetch_embeddings: sends the EMBED_BATCH_SIZE chunks concurrently, at most `concurrency` at a time.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch_chunk(chunk: list) -> list:
+        async with semaphore:
+            result = await _client().aio.models.embed_content(model=model, contents=chunk, config=_EMBED_CONFIG)
+        return _embeddings_from(result, chunk)
+
+    chunks = await asyncio.gather(*(
+        fetch_chunk(texts[start:start + EMBED_BATCH_SIZE])
+        for start in range(0, len(texts), EMBED_BATCH_SIZE)
+    ))
+    embeddings = [embedding for chunk in chunks for embedding in chunk]
+
+    print(f"[{log_prefix}] Generated {len(embeddings)} Google embedding(s) (dim={len(embeddings[0])})")
+    return embeddings
+
+def embed_texts(texts: list, log_prefix: str, model: str = EMBEDDING_MODEL) -> np.ndarray:
+    """
+    Converts a list of texts into an (N, 768) float32 embedding matrix in as few API calls as possible.
+    Empty texts map to zero rows; previously seen texts are served from the embedding cache.
+
+    Args:
+        texts: Texts to embed
+        log_prefix: Tag for log lines, e.g. "embed_resume"
+        model: Embedding model name
+
+    Returns:
+        np.ndarray: (len(texts), EMBEDDING_DIM) float32 matrix
+    """
+    embeddings = np.zeros((len(texts), EMBEDDING_DIM), dtype=np.float32)
+    pending = [idx for idx, text in enumerate(texts) if text]
+    if not pending:
+        return embeddings
+
+    try:
+        embedder = get_embedder(model, EMBEDDING_CACHE_PATH)
+        fetched = embedder.embed(
+            [texts[idx] for idx in pending],
+            lambda misses: _fetch_embeddings(misses, model, log_prefix)
+        )
+        for idx, embedding in zip(pending, fetched):
+            embeddings[idx] = embedding
+        return embeddings
+    except Exception as e:
+        print(f"[{log_prefix}] ❌ Error generating embeddings: {str(e)}")
+        raise
+
+async def aembed_texts(
+    texts: list,
+    log_prefix: str,
+    concurrency: int = EMBED_CONCURRENCY,
+    model: str = EMBEDDING_MODEL
+) -> np.ndarray:
+    """
+    Async embed_texts for bulk ingestion: cache misses go out as up to `concurrency` overlapping requests.
+    """
+    embeddings = np.zeros((len(texts), EMBEDDING_DIM), dtype=np.float32)
+    pending = [idx for idx, text in enumerate(texts) if text]
+    if not pending:
+        return embeddings
+
+    try:
+        fetched = await get_embedder(model, EMBEDDING_CACHE_PATH).aembed(
+            [texts[idx] for idx in pending],
+            lambda misses: _afetch_embeddings(misses, concurrency, model, log_prefix)
+        )
+        for idx, embedding in zip(pending, fetched):
+            embeddings[idx] = embedding
+        return embeddings
+    except Exception as e:
+        print(f"[{log_prefix}] ❌ Error generating embeddings: {str(e)}")
+        raise
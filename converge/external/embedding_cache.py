@@ -0,0 +1,157 @@
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, List
+
+import numpy as np
+
+# -------- CONFIG --------
+LRU_CAPACITY = 10000  # vectors kept in process memory
+
+_embedders = {}
+_embedders_lock = threading.Lock()
+
+# -------- CACHED EMBEDDER --------
+class CachedEmbedder:
+    """
+    Content-addressed cache in front of a batch embedding function.
+
+    Lookups go in-process LRU → on-disk SQLite → remote API. Keys are
+    sha256(model_name + "\\0" + text), so swapping the embedding model never
+    returns vectors produced by a different model. Vectors are stored as
+    float32 bytes (3 KB for a 768-dim embedding).
+
+    The SQLite file is opened on the first lookup. The disk layer is best
+    effort: if the file cannot be opened, read or written (read-only
+    directory, "database is locked"), the error is logged and the embedding
+    is still returned from memory or the API.
+    """
+
+    def __init__(self, model_name: str, db_path: str, capacity: int = LRU_CAPACITY):
+        self.model_name = model_name
+        self.db_path = str(db_path)
+        self.capacity = capacity
+        self.lru = OrderedDict()
+        self.lock = threading.Lock()
+        self.conn = None
+        self.disk_enabled = True
+
+    def _db(self):
+        """SQLite connection, opened on first use; None once the disk cache is unusable."""
+        if self.conn is None and self.disk_enabled:
+            try:
+                self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                self.conn.execute("CREATE TABLE IF NOT EXISTS emb(key BLOB PRIMARY KEY, vec BLOB)")
+                self.conn.commit()
+            except sqlite3.Error as e:
+                print(f"[embedding_cache] ⚠️ Disk cache {self.db_path} unavailable, caching in memory only: {e}")
+                self.conn = None
+                self.disk_enabled = False
+        return self.conn
+
+    def key(self, text: str) -> bytes:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode()).digest()
+
+    def _remember(self, key: bytes, vec: np.ndarray):
+        self.lru[key] = vec
+        self.lru.move_to_end(key)
+        if len(self.lru) > self.capacity:
+            self.lru.popitem(last=False)
+
+    def _lookup(self, key: bytes):
+        vec = self.lru.get(key)
+        if vec is not None:
+            self.lru.move_to_end(key)
+            return vec
+        conn = self._db()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute("SELECT vec FROM emb WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            print(f"[embedding_cache] ⚠️ Disk cache read failed: {e}")
+            return None
+        if row is None:
+            return None
+        vec = np.frombuffer(row[0], dtype=np.float32)
+        self._remember(key, vec)
+        return vec
+
+    def _collect(self, texts: List[str]):
+        """Fill cached results and group cache misses by key (repeated texts cost one API slot)."""
+        keys = [self.key(text) for text in texts]
+        results = [None] * len(texts)
+
+        with self.lock:
+            for idx, key in enumerate(keys):
+                vec = self._lookup(key)
+                if vec is not None:
+                    results[idx] = vec
+
+        misses = {}
+        for idx, key in enumerate(keys):
+            if results[idx] is None:
+                misses.setdefault(key, []).append(idx)
+        return results, misses
+
+    def _store(self, misses: dict, fetched: List[list], results: list):
+        with self.lock:
+            rows = []
+            for (key, idxs), embedding in zip(misses.items(), fetched):
+                vec = np.asarray(embedding, dtype=np.float32)
+                self._remember(key, vec)
+                rows.append((key, vec.tobytes()))
+                for idx in idxs:
+                    results[idx] = vec
+            conn = self._db()
+            if conn is None:
+                return
+            try:
+                conn.executemany("INSERT OR REPLACE INTO emb(key, vec) VALUES (?, ?)", rows)
+                conn.commit()
+            except sqlite3.Error as e:
+                # The embeddings are already in hand; a failed write only costs a future cache hit
+                print(f"[embedding_cache] ⚠️ Disk cache write failed: {e}")
+                try:
+                    conn.rollback()
+                except sqlite3.Error:
+                    pass
+
+    def embed(
+        self,
+        texts: List[str],
+        fetch_batch: Callable[[List[str]], List[list]]
+    ) -> List[np.ndarray]:
+        """Return one float32 embedding per text, calling fetch_batch only for cache misses."""
+        results, misses = self._collect(texts)
+        if misses:
+            fetched = fetch_batch([texts[idxs[0]] for idxs in misses.values()])
+            self._store(misses, fetched, results)
+        return results
+
+    async def aembed(
+        self,
+        texts: List[str],
+        afetch_batch: Callable[[List[str]], Awaitable[List[list]]]
+    ) -> List[np.ndarray]:
+        """Async embed(): cache misses are fetched by awaiting afetch_batch; SQLite I/O runs in a thread."""
+        results, misses = await asyncio.to_thread(self._collect, texts)
+        if misses:
+            fetched = await afetch_batch([texts[idxs[0]] for idxs in misses.values()])
+            await asyncio.to_thread(self._store, misses, fetched, results)
+        return results
+
+# -------- SHARED CACHE --------
+def get_embedder(model_name: str, db_path: str) -> CachedEmbedder:
+    """
+    Process-wide CachedEmbedder for (model_name, db_path), created on first use so
+    importing the embedding modules never touches the disk. Resume and project
+    embedding share one instance, and so one LRU and one SQLite connection.
+    """
+    key = (model_name, str(db_path))
+    with _embedders_lock:
+        if key not in _embedders:
+            _embedders[key] = CachedEmbedder(model_name, db_path)
+        return _embedders[key]
@@ -0,0 +1,119 @@
+import os
+import orjson
+import numpy as np
+from typing import Dict, List, Tuple
+
+# -------- CONFIG --------
+EMBEDDING_DIM = 768
+
+# -------- STORE LAYOUT --------
+# An embedding store named "user_embeddings" is four files:
+#   user_embeddings.npy        (N, 768) float32 matrix, one row per record
+#   user_embeddings_meta.json  list of N metadata dicts (every key except "embedding")
+#   user_embeddings_i8.npy     (N, 768) int8 quantization of the L2-normalized rows
+#   user_embeddings_scale.npy  (N,) float32 per-row dequantization scale
+
+def store_paths(name: str) -> Tuple[str, str]:
+    """Return the (matrix, metadata) file paths for a store."""
+    return f"{name}.npy", f"{name}_meta.json"
+
+def quantized_paths(name: str) -> Tuple[str, str]:
+    """Return the (int8 matrix, scale) file paths for a store."""
+    return f"{name}_i8.npy", f"{name}_scale.npy"
+
+# -------- VECTOR HELPERS --------
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize each row in place; all-zero rows are left as zeros."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+def quantize_rows(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Symmetric per-row int8 quantization: row ≈ q * scale.
+
+    Returns:
+        Tuple[q, scale]: (N, D) int8 matrix and (N,) float32 scales
+    """
+    matrix = np.atleast_2d(matrix)
+    scale = (np.abs(matrix).max(axis=1) / 127.0).astype(np.float32)
+    scale[scale == 0] = 1.0  # all-zero rows quantize to zeros
+    q = np.round(matrix / scale[:, None]).astype(np.int8)
+    return q, scale
+
+# -------- DATABASE PACKING --------
+# ResumeEmbedding/ProjectEmbedding.embedding_f32 store the unit-length vector as
+# native float32 bytes. The tasks, views and data migrations that write or read
+# it all go through these helpers so the format is defined in one place.
+
+def unit_vector(embedding) -> np.ndarray:
+    """Float32 copy of one embedding at unit length; a zero vector stays zero."""
+    return normalize_rows(np.array(embedding, dtype=np.float32).reshape(1, -1))[0]
+
+def pack_embedding(vector: np.ndarray) -> bytes:
+    """embedding_f32 bytes for a unit-length vector."""
+    return np.ascontiguousarray(vector, dtype=np.float32).tobytes()
+
+def unpack_embedding(packed: bytes) -> np.ndarray:
+    """Read-only float32 vector (or concatenated vectors) from embedding_f32 bytes."""
+    return np.frombuffer(packed, dtype=np.float32)
+
+def _save_npy(path: str, array: np.ndarray):
+    # Write to a temp file and swap in, so readers never mmap a half-written matrix
+    with open(f"{path}.tmp", "wb") as f:
+        np.save(f, array)
+    os.replace(f"{path}.tmp", path)
+
+def save_embedding_store(records: List[Dict], name: str):
+    """
+    Write embedding records as a float32 matrix plus a parallel metadata JSON,
+    and an int8-quantized copy of the normalized rows.
+
+    Args:
+        records: List of dicts, each with an "embedding" key
+        name: Store name (file prefix)
+    """
+    npy_path, meta_path = store_paths(name)
+    matrix = np.asarray(
+        [record["embedding"] for record in records],
+        dtype=np.float32
+    ).reshape(len(records), EMBEDDING_DIM)
+    meta = [{k: v for k, v in record.items() if k != "embedding"} for record in records]
+    q, scale = quantize_rows(normalize_rows(matrix.copy()))
+
+    i8_path, scale_path = quantized_paths(name)
+    _save_npy(i8_path, q)
+    _save_npy(scale_path, scale)
+    _save_npy(npy_path, matrix)
+    with open(f"{meta_path}.tmp", "wb") as f:
+        f.write(orjson.dumps(meta, option=orjson.OPT_INDENT_2))
+    os.replace(f"{meta_path}.tmp", meta_path)
+
+def load_embedding_store(name: str) -> Tuple[List[Dict], np.ndarray]:
+    """
+    Load a store's metadata and memory-mapped (read-only) embedding matrix.
+
+    Raises:
+        FileNotFoundError: If the store has not been written yet
+    """
+    npy_path, meta_path = store_paths(name)
+    matrix = np.load(npy_path, mmap_mode="r")
+    with open(meta_path, "rb") as f:
+        meta = orjson.loads(f.read())
+    return meta, matrix
+
+def load_quantized_store(name: str) -> Tuple[List[Dict], np.ndarray, np.ndarray]:
+    """
+    Load a store's metadata, memory-mapped int8 matrix and per-row scales.
+
+    Raises:
+        FileNotFoundError: If the store (or its quantized copy) has not been written yet
+    """
+    i8_path, scale_path = quantized_paths(name)
+    _, meta_path = store_paths(name)
+    q = np.load(i8_path, mmap_mode="r")
+    scale = np.load(scale_path)
+    with open(meta_path, "rb") as f:
+        meta = orjson.loads(f.read())
+    return meta, q, scale
@@ -0,0 +1,47 @@
+import atexit
+import importlib.util
+import threading
+
+# -------- CONFIG --------
+GENAI_MAX_CONNECTIONS = 64      # sockets per pool; httpx defaults to far fewer than batch fan-out needs
+GENAI_MAX_KEEPALIVE = 32        # idle connections kept warm between requests
+GENAI_TIMEOUT = 60.0            # seconds
+GENAI_HTTP2 = importlib.util.find_spec("h2") is not None  # multiplex streams when httpx[http2] is installed
+
+_client = None
+_client_lock = threading.Lock()
+
+# -------- SHARED CLIENT --------
+def get_client(api_key: str):
+    """
+    Process-wide google-genai client shared by parsing and embedding.
+
+    Sync and async calls each get one pooled httpx client, so concurrent batch
+    requests reuse warm connections instead of queueing on the default pool limits.
+    google.genai is imported on first use, keeping it out of Django start-up.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import httpx
+                from google.genai import Client, types
+
+                limits = httpx.Limits(max_connections=GENAI_MAX_CONNECTIONS, max_keepalive_connections=GENAI_MAX_KEEPALIVE)
+                _client = Client(
+                    api_key=api_key,
+                    http_options=types.HttpOptions(
+                        httpx_client=httpx.Client(limits=limits, http2=GENAI_HTTP2, timeout=GENAI_TIMEOUT),
+                        httpx_async_client=httpx.AsyncClient(limits=limits, http2=GENAI_HTTP2, timeout=GENAI_TIMEOUT),
+                    ),
+                )
+    return _client
+
+@atexit.register
+def close_client():
+    """Close the shared client's sync connection pool (async sockets close with their event loop)."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
@@ -0,0 +1,67 @@
+import os
+import sys
+import faiss
+import numpy as np
+from typing import Tuple
+from external.embedding_store import load_embedding_store, normalize_rows, store_paths
+
+# -------- CONFIG --------
+USER_EMBEDDINGS_STORE = "user_embeddings"
+USER_INDEX_FILE = "users.faiss"
+HNSW_M = 32                # graph neighbours per node
+HNSW_EF_CONSTRUCTION = 80  # build-time search depth
+HNSW_EF_SEARCH = 64        # query-time search depth (recall vs latency)
+
+# -------- INDEX BUILD --------
+def build_user_index(user_matrix: np.ndarray) -> faiss.Index:
+    """
+    Build an HNSW index over row-normalized user embeddings.
+
+    Inner product on unit vectors is cosine similarity, so search distances
+    can be compared directly with the semantic gate thresholds.
+    """
+    user_matrix = np.ascontiguousarray(user_matrix, dtype=np.float32)
+    index = faiss.IndexHNSWFlat(user_matrix.shape[1], HNSW_M, faiss.METRIC_INNER_PRODUCT)
+    index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    index.add(user_matrix)
+    return index
+
+def build_and_save_user_index(store_name: str = USER_EMBEDDINGS_STORE, index_file: str = USER_INDEX_FILE) -> int:
+    """Rebuild the user index from the embedding store and persist it. Returns the row count."""
+    _, matrix = load_embedding_store(store_name)
+    index = build_user_index(normalize_rows(np.array(matrix, dtype=np.float32)))
+    faiss.write_index(index, index_file)
+    return index.ntotal
+
+# -------- INDEX QUERY --------
+def index_is_fresh(store_name: str = USER_EMBEDDINGS_STORE, index_file: str = USER_INDEX_FILE) -> bool:
+    """True if the index exists and was written after the embedding store's matrix."""
+    try:
+        return os.path.getmtime(index_file) >= os.path.getmtime(store_paths(store_name)[0])
+    except FileNotFoundError:
+        return False
+
+def load_user_index(index_file: str = USER_INDEX_FILE) -> faiss.Index:
+    index = faiss.read_index(index_file)
+    index.hnsw.efSearch = HNSW_EF_SEARCH
+    return index
+
+def search_user_index(index: faiss.Index, project_embedding, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Approximate top-k users by cosine similarity.
+
+    Returns:
+        Tuple[similarities, row_indices]: best first; unfilled slots are dropped
+    """
+    # Copy: normalize_L2 works in place and ignores read-only flags (np.frombuffer rows)
+    p = np.array(project_embedding, dtype=np.float32).reshape(1, -1)
+    faiss.normalize_L2(p)
+    D, I = index.search(p, k)
+    found = I[0] >= 0
+    return D[0][found], I[0][found]
+
+# -------- MAIN --------
+if __name__ == "__main__":
+    store_name = sys.argv[1] if len(sys.argv) > 1 else USER_EMBEDDINGS_STORE
+    count = build_and_save_user_index(store_name)
+    print(f"✅ Indexed {count} users → {USER_INDEX_FILE}")
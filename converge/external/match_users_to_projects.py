@@ -1,12 +1,54 @@
-import json
+import os
+import logging
+import orjson
 import numpy as np
 import math
-from sklearn.metrics.pairwise import cosine_similarity
-from typing import List, Dict, Tuple
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Mapping, Tuple
+from scipy.sparse import csr_matrix
+try:
+    import simsimd  # optional SIMD (AVX2/AVX-512/NEON) distance kernels
+except ImportError:
+    simsimd = None
+try:
+    from numba import njit  # optional; compiles the scalar scoring kernels below
+except ImportError:
+    def njit(*args, **kwargs):
+        return lambda func: func
 from ratings.services import get_global_rating_data
+from external.embedding_store import (
+    EMBEDDING_DIM,
+    load_embedding_store,
+    load_quantized_store,
+    normalize_rows,
+    quantize_rows,
+    quantized_paths,
+    store_paths
+)
+
+logger = logging.getLogger(__name__)
 
 # -------- CONFIG --------
 
+# Embedding stores written by process_resume / process_project (see embedding_store.py)
+USER_EMBEDDINGS_STORE = "user_embeddings"
+PROJECT_EMBEDDINGS_STORE = "project_embeddings"
+
+# Gate on the int8-quantized user matrix (4x less memory traffic, ~1e-3 similarity error)
+SEMANTIC_GATE_INT8 = False
+QUANTIZED_CHUNK_ROWS = 8192  # rows upcast to int32 per matmul chunk
+
+# Gate a candidate_pool via the FAISS HNSW index (external/index.py) when it is fresh
+SEMANTIC_GATE_ANN = False
+
+# Threads used to read candidate resume JSONs after the semantic gate
+USER_JSON_LOAD_WORKERS = 32
+
+# Parsed resume / project JSONs kept in memory per process (see clear_caches)
+JSON_CACHE_SIZE = 4096
+
 # Semantic relevance thresholds (empirical)
 SEMANTIC_THRESHOLDS = {
     "unrelated": 0.30,           # < 0.30
@@ -56,45 +98,98 @@ EXPERIENCE_LEVELS = {
 }
 
 # -------- DATA LOADING --------
+def _store_mtime(name: str) -> Tuple[int, int]:
+    """Modification times of a store's files; raises FileNotFoundError if missing."""
+    return tuple(os.stat(path).st_mtime_ns for path in store_paths(name))
+
+def _load_normalized_store(name: str) -> Tuple[List[Dict], np.ndarray]:
+    """Load a store and L2-normalize its rows into a read-only float32 matrix."""
+    meta, matrix = load_embedding_store(name)
+    normalized = normalize_rows(np.array(matrix, dtype=np.float32))
+    normalized.setflags(write=False)
+    return meta, normalized
+
+@lru_cache(maxsize=1)
+def _load_user_matrix(mtime: Tuple[int, int]) -> Tuple[List[Dict], np.ndarray]:
+    """Normalized user store, cached across requests until the files' mtime changes."""
+    return _load_normalized_store(USER_EMBEDDINGS_STORE)
+
+@lru_cache(maxsize=1)
+def _load_project_matrix(mtime: Tuple[int, int]) -> Tuple[List[Dict], np.ndarray]:
+    """Normalized project store, cached across requests until the files' mtime changes."""
+    return _load_normalized_store(PROJECT_EMBEDDINGS_STORE)
+
+@lru_cache(maxsize=1)
+def _load_user_matrix_int8(mtime: Tuple[int, ...]) -> Tuple[List[Dict], np.ndarray, np.ndarray]:
+    """Quantized user store, cached across requests until the files' mtime changes."""
+    return load_quantized_store(USER_EMBEDDINGS_STORE)
+
+def load_user_matrix_int8() -> Tuple[List[Dict], np.ndarray, np.ndarray]:
+    """Load user metadata, the int8 (N, 768) user matrix and its per-row scales."""
+    paths = quantized_paths(USER_EMBEDDINGS_STORE) + store_paths(USER_EMBEDDINGS_STORE)[1:]
+    try:
+        mtime = tuple(os.stat(path).st_mtime_ns for path in paths)
+        return _load_user_matrix_int8(mtime)
+    except FileNotFoundError:
+        print(f"❌ {paths[0]} not found (run migrate_embeddings.py)")
+        return [], np.empty((0, EMBEDDING_DIM), dtype=np.int8), np.empty(0, dtype=np.float32)
+
+@lru_cache(maxsize=1)
+def _load_user_index(mtime: float):
+    """HNSW user index, cached across requests until the index file's mtime changes."""
+    from external.index import load_user_index
+    return load_user_index()
+
 def load_project_embeddings() -> Dict:
-    """Load project embeddings from file."""
+    """Load (normalized) project embeddings from the .npy store."""
     try:
-        with open("project_embeddings.json", "r") as f:
-            data = json.load(f)
-            return {proj["project_id"]: proj for proj in data}
+        meta, matrix = _load_project_matrix(_store_mtime(PROJECT_EMBEDDINGS_STORE))
     except FileNotFoundError:
-        print("❌ project_embeddings.json not found")
+        print(f"❌ {PROJECT_EMBEDDINGS_STORE}.npy not found (run migrate_embeddings.py)")
         return {}
+    return {proj["project_id"]: {**proj, "embedding": matrix[idx]} for idx, proj in enumerate(meta)}
 
-def load_user_embeddings() -> Dict:
-    """Load user embeddings from file."""
+def load_user_matrix() -> Tuple[List[Dict], np.ndarray]:
+    """Load user metadata and the row-normalized (N, 768) user embedding matrix."""
     try:
-        with open("user_embeddings.json", "r") as f:
-            data = json.load(f)
-            return {user["user_id"]: user for user in data}
+        return _load_user_matrix(_store_mtime(USER_EMBEDDINGS_STORE))
     except FileNotFoundError:
-        print("❌ user_embeddings.json not found")
-        return {}
+        print(f"❌ {USER_EMBEDDINGS_STORE}.npy not found (run migrate_embeddings.py)")
+        return [], np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+
+def load_user_embeddings() -> Dict:
+    """Load (normalized) user embeddings from the .npy store."""
+    meta, matrix = load_user_matrix()
+    return {user["user_id"]: {**user, "embedding": matrix[idx]} for idx, user in enumerate(meta)}
 
-def load_project_json(project_id: str) -> Dict:
-    """Load individual project JSON file."""
+@lru_cache(maxsize=JSON_CACHE_SIZE)
+def _read_json(path: str) -> Mapping:
+    # FileNotFoundError propagates, and lru_cache never caches exceptions,
+    # so a file written after a miss is picked up on the next call
+    with open(path, "rb") as f:
+        return MappingProxyType(orjson.loads(f.read()))
+
+def load_project_json(project_id: str) -> Mapping:
+    """Load individual project JSON file (cached; returns a read-only mapping)."""
     try:
-        with open(f"project_jsons/{project_id}.json", "r") as f:
-            return json.load(f)
+        return _read_json(f"project_jsons/{project_id}.json")
     except FileNotFoundError:
-        return {}
+        return MappingProxyType({})
 
-def load_user_json(resume_file: str) -> Dict:
-    """Load individual user JSON file."""
+def load_user_json(resume_file: str) -> Mapping:
+    """Load individual user JSON file (cached; returns a read-only mapping)."""
     try:
-        with open(f"resume_jsons/{resume_file}.json", "r") as f:
-            return json.load(f)
+        return _read_json(f"resume_jsons/{resume_file}.json")
     except FileNotFoundError:
-        return {}
+        return MappingProxyType({})
+
+def clear_caches():
+    """Drop cached JSON files; ingest calls this after rewriting resume or project JSONs."""
+    _read_json.cache_clear()
 
 # -------- LAYER 1: CAPABILITY AND ALIGNMENT SCORE --------
 
-def compute_semantic_similarity(project_embedding: list, user_embedding: list) -> float:
+def compute_semantic_similarity(project_embedding: np.ndarray, user_embedding: np.ndarray) -> float:
     """
     Compute cosine similarity between project and user embeddings.
     
@@ -105,15 +200,25 @@ def compute_semantic_similarity(project_embedding: list, user_embedding: list) -
     Returns:
         float: Cosine similarity score (0-1)
     """
-    proj_vec = np.array(project_embedding).reshape(1, -1)
-    user_vec = np.array(user_embedding).reshape(1, -1)
-    
-    similarity = cosine_similarity(proj_vec, user_vec)[0][0]
-    return float(similarity)
+    proj_vec = np.ascontiguousarray(project_embedding, dtype=np.float32)
+    user_vec = np.ascontiguousarray(user_embedding, dtype=np.float32)
+    
+    if simsimd is not None:
+        # Single C call per pair; simsimd reports distance 0 for two zero vectors
+        distance = simsimd.cosine(proj_vec, user_vec)
+        if distance == 0.0 and not proj_vec.any():
+            return 0.0
+        return 1.0 - float(distance)
+    
+    # One sqrt over the product of squared norms instead of two np.linalg.norm calls
+    denom_sq = np.vdot(proj_vec, proj_vec) * np.vdot(user_vec, user_vec)
+    if denom_sq == 0:
+        return 0.0  # zero vector (empty semantic text) is unrelated to everything
+    return float(proj_vec @ user_vec / np.sqrt(denom_sq))
 
 def semantic_relevance_filter(
-    project_embedding: list,
-    user_embedding: list
+    project_embedding: np.ndarray,
+    user_embedding: np.ndarray
 ) -> Tuple[bool, float, str]:
     """
     Apply semantic relevance filter with empirical thresholds.
@@ -131,20 +236,70 @@ def semantic_relevance_filter(
         Tuple[passes_filter, similarity, interpretation]
     """
     similarity = compute_semantic_similarity(project_embedding, user_embedding)
+    passes, interpretation = interpret_similarity(similarity)
+    return passes, similarity, interpretation
+
+def interpret_similarity(similarity: float) -> Tuple[bool, str]:
+    """
+    Map a cosine similarity onto the semantic gate's empirical thresholds.
     
+    Returns:
+        Tuple[passes_filter, interpretation]
+    """
     if similarity < SEMANTIC_THRESHOLDS["unrelated"]:
-        return False, similarity, "unrelated"
+        return False, "unrelated"
     elif SEMANTIC_THRESHOLDS["meaningful"][0] <= similarity <= SEMANTIC_THRESHOLDS["meaningful"][1]:
-        return True, similarity, "meaningful"
+        return True, "meaningful"
     elif similarity > SEMANTIC_THRESHOLDS["strong"]:
-        return True, similarity, "strong"
+        return True, "strong"
     else:
         # 0.30-0.35: borderline, reject
-        return False, similarity, "borderline"
+        return False, "borderline"
+
+def batch_semantic_similarity(project_embedding: np.ndarray, user_matrix: np.ndarray) -> np.ndarray:
+    """
+    Cosine similarity of one project against every user in a single matmul.
+    
+    Args:
+        project_embedding: Project embedding vector
+        user_matrix: (N, 768) float32 matrix of row-normalized user embeddings
+    
+    Returns:
+        np.ndarray: (N,) cosine similarities
+    """
+    p = np.asarray(project_embedding, dtype=np.float32)
+    norm = np.sqrt(np.vdot(p, p))
+    if norm:
+        p = p / norm
+    return user_matrix @ p
+
+def semantic_gate_mask(similarities: np.ndarray) -> np.ndarray:
+    """
+    Vectorized semantic_relevance_filter: True where interpret_similarity would pass.
+    
+    Meaningful and strong both pass and together cover every score at or above
+    the meaningful floor, so the gate is a single comparison over the array.
+    """
+    return similarities >= SEMANTIC_THRESHOLDS["meaningful"][0]
+
+def normalize_skills(user_skills: Dict[str, list]) -> List[str]:
+    """
+    Flatten a resume's skills-by-category into a sorted list of lowercased skills.
+    
+    Ingest stores this on the resume JSON as "_skills_norm" so scoring doesn't
+    re-lowercase every skill on every match call.
+    """
+    return sorted({
+        s.lower()
+        for skill_list in user_skills.values()
+        if isinstance(skill_list, list)
+        for s in skill_list
+    })
 
 def score_skill_match(
     required_skills: List[str],
-    user_skills: Dict[str, list]
+    user_skills: Dict[str, list],
+    user_skills_norm: List[str] = None
 ) -> float:
     """
     Score skill match with partial credit for related skills.
@@ -155,6 +310,7 @@ def score_skill_match(
     Args:
         required_skills: List of required skills
         user_skills: Dict of user's skills by category
+        user_skills_norm: Precomputed normalize_skills(user_skills), if stored at ingest
     
     Returns:
         float: Skill match score (0-1)
@@ -163,13 +319,12 @@ def score_skill_match(
         return 1.0  # No requirements = perfect match
     
     # Flatten all user skills
-    all_user_skills = set()
-    for skill_list in user_skills.values():
-        if isinstance(skill_list, list):
-            all_user_skills.update([s.lower() for s in skill_list])
+    if user_skills_norm is None:
+        user_skills_norm = normalize_skills(user_skills)
+    all_user_skills = frozenset(user_skills_norm)
     
     # Normalize required skills
-    required_normalized = set([s.lower() for s in required_skills])
+    required_normalized = {s.lower() for s in required_skills}
     
     # Compute exact matches
     exact_matches = len(required_normalized & all_user_skills)
@@ -179,6 +334,56 @@ def score_skill_match(
     
     return min(1.0, score)
 
+def build_skill_matrix(user_jsons: List[Dict]) -> Tuple[Dict[str, int], csr_matrix]:
+    """
+    Encode users' skills as a sparse binary matrix over a lowercased skill vocabulary.
+    
+    Args:
+        user_jsons: Resume JSONs, one per matrix row
+    
+    Returns:
+        Tuple[vocab, skill_matrix]: skill → column index, and (N, V) uint8 CSR matrix
+    """
+    vocab = {}
+    rows, cols = [], []
+    for row, user_json in enumerate(user_jsons):
+        skills_norm = user_json.get("_skills_norm")
+        if skills_norm is None:
+            skills_norm = normalize_skills(user_json.get("skills", {}))
+        for skill in skills_norm:
+            rows.append(row)
+            cols.append(vocab.setdefault(skill, len(vocab)))
+    
+    skill_matrix = csr_matrix(
+        (np.ones(len(rows), dtype=np.uint8), (rows, cols)),
+        shape=(len(user_jsons), len(vocab))
+    )
+    skill_matrix.data[:] = 1  # a skill listed under several categories still counts once
+    return vocab, skill_matrix
+
+def batch_skill_match(
+    required_skills: List[str],
+    vocab: Dict[str, int],
+    skill_matrix: csr_matrix
+) -> np.ndarray:
+    """
+    Vectorized score_skill_match for every row of a skill matrix: one sparse matmul
+    against the project's required-skill indicator vector.
+    
+    Returns:
+        np.ndarray: (N,) skill match scores (0-1)
+    """
+    n_users = skill_matrix.shape[0]
+    if not required_skills:
+        return np.ones(n_users)  # No requirements = perfect match
+    
+    required_normalized = {s.lower() for s in required_skills}
+    required_vec = np.zeros(len(vocab), dtype=np.int32)
+    required_vec[[vocab[s] for s in required_normalized if s in vocab]] = 1
+    
+    exact_matches = skill_matrix @ required_vec
+    return np.minimum(1.0, exact_matches / len(required_normalized))
+
 def score_experience_alignment(
     project_type: str,
     user_overall_experience: str
@@ -216,13 +421,46 @@ def score_experience_alignment(
     else:
         return 0.3  # Far from preferred
 
+# -------- SCORING KERNELS --------
+# Numeric cores of the layer scores: floats in, float out, no dicts, so numba can
+# compile them when installed. Callers round and build the response dicts.
+
+@njit(cache=True)
+def _capability_kernel(s_semantic, s_skills, s_experience, w_semantic, w_skills, w_experience):
+    return min(1.0, w_semantic * s_semantic + w_skills * s_skills + w_experience * s_experience)
+
+@njit(cache=True)
+def _rating_kernel(global_rating):
+    if global_rating == 0:
+        return 0.5  # No rating = neutral
+    # Normalize 1-5 to 0-1
+    return min(1.0, max(0.0, (global_rating - 1.0) / 4.0))
+
+@njit(cache=True)
+def _reliability_kernel(completed_projects, dropped_projects, availability):
+    # Completion ratio (with epsilon to avoid division by zero)
+    completion = completed_projects / (completed_projects + dropped_projects + EPSILON)
+    # Base reliability
+    r_base = 0.7 * completion + 0.3 * availability
+    # Confidence factor (exponential) over total projects
+    gamma = 1.0 - math.exp(-(completed_projects + dropped_projects) / COMPLETION_CONFIDENCE_CONSTANT)
+    return min(1.0, max(0.0, (gamma * r_base) + ((1.0 - gamma) * RELIABILITY_PRIOR)))
+
+@njit(cache=True)
+def _blend_kernel(weight, first, second_weight, second):
+    # min(1, w1 * a + w2 * b), shared by the trust and final scores
+    return min(1.0, weight * first + second_weight * second)
+
 def compute_capability_score(
-    project_embedding: list,
-    user_embedding: list,
+    project_embedding: np.ndarray,
+    user_embedding: np.ndarray,
     project_type: str,
     required_skills: List[str],
     user_skills: Dict[str, list],
-    user_experience: str
+    user_experience: str,
+    semantic_score: float = None,
+    skill_score: float = None,
+    user_skills_norm: List[str] = None
 ) -> Dict:
     """
     LAYER 1: Compute Capability and Alignment Score
@@ -237,28 +475,36 @@ def compute_capability_score(
         required_skills: Required skills for project
         user_skills: User's available skills
         user_experience: User's overall experience level
+        semantic_score: Precomputed cosine similarity (skips recomputing it)
+        skill_score: Precomputed skill match score (skips recomputing it)
+        user_skills_norm: User's skills as stored by ingest in "_skills_norm"
     
     Returns:
         dict: Capability score components
     """
     # Semantic component
-    s_semantic = compute_semantic_similarity(project_embedding, user_embedding)
+    if semantic_score is None:
+        s_semantic = compute_semantic_similarity(project_embedding, user_embedding)
+    else:
+        s_semantic = semantic_score
     
     # Skills component
-    s_skills = score_skill_match(required_skills, user_skills)
+    if skill_score is None:
+        s_skills = score_skill_match(required_skills, user_skills, user_skills_norm)
+    else:
+        s_skills = skill_score
     
     # Experience component
     s_experience = score_experience_alignment(project_type, user_experience)
     
     # Weighted combination
-    capability_score = (
-        C_WEIGHTS["semantic"] * s_semantic +
-        C_WEIGHTS["skills"] * s_skills +
-        C_WEIGHTS["experience"] * s_experience
+    capability_score = _capability_kernel(
+        float(s_semantic), float(s_skills), float(s_experience),
+        C_WEIGHTS["semantic"], C_WEIGHTS["skills"], C_WEIGHTS["experience"]
     )
     
     return {
-        "capability_score": round(min(1.0, capability_score), 4),
+        "capability_score": round(capability_score, 4),
         "s_semantic": round(s_semantic, 4),
         "s_skills": round(s_skills, 4),
         "s_experience": round(s_experience, 4)
@@ -276,12 +522,7 @@ def score_rating(global_rating: float) -> float:
     Returns:
         float: Rating score (0-1)
     """
-    if global_rating == 0:
-        return 0.5  # No rating = neutral
-    
-    # Normalize 1-5 to 0-1
-    normalized = (global_rating - 1.0) / 4.0
-    return min(1.0, max(0.0, normalized))
+    return _rating_kernel(float(global_rating))
 
 def score_reliability(
     completed_projects: int,
@@ -309,22 +550,8 @@ def score_reliability(
     availability_map = {"low": 0.3, "medium": 0.6, "high": 1.0}
     A = availability_map.get(availability.lower(), 0.6)
     
-    # Completion ratio (with epsilon to avoid division by zero)
-    C = completed_projects / (completed_projects + dropped_projects + EPSILON)
-    
-    # Base reliability
-    r_base = 0.7 * C + 0.3 * A
-    
-    # Total projects for confidence
-    n = completed_projects + dropped_projects
-    
-    # Confidence factor (exponential)
-    gamma = 1.0 - math.exp(-n / COMPLETION_CONFIDENCE_CONSTANT)
-    
-    # Final reliability score
-    s_reliability = (gamma * r_base) + ((1.0 - gamma) * RELIABILITY_PRIOR)
-    
-    return round(min(1.0, max(0.0, s_reliability)), 4)
+    s_reliability = _reliability_kernel(float(completed_projects), float(dropped_projects), A)
+    return round(s_reliability, 4)
 
 def compute_trust_score(
     global_rating: float,
@@ -350,13 +577,10 @@ def compute_trust_score(
     s_rating = score_rating(global_rating)
     s_reliability = score_reliability(completed_projects, dropped_projects, availability)
     
-    trust_score = (
-        T_WEIGHTS["rating"] * s_rating +
-        T_WEIGHTS["reliability"] * s_reliability
-    )
+    trust_score = _blend_kernel(T_WEIGHTS["rating"], s_rating, T_WEIGHTS["reliability"], s_reliability)
     
     return {
-        "trust_score": round(min(1.0, trust_score), 4),
+        "trust_score": round(trust_score, 4),
         "s_rating": round(s_rating, 4),
         "s_reliability": s_reliability,
         "completion_ratio": round(completed_projects / (completed_projects + dropped_projects + EPSILON), 3)
@@ -389,17 +613,69 @@ def compute_final_score(
     """
     alpha = PROJECT_TYPE_ALPHA.get(project_type, 0.65)
     
-    final_score = (alpha * capability_score) + ((1.0 - alpha) * trust_score)
+    final_score = _blend_kernel(alpha, float(capability_score), 1.0 - alpha, float(trust_score))
     
     return {
-        "final_score": round(min(1.0, final_score), 4),
+        "final_score": round(final_score, 4),
         "alpha": alpha,
         "formula": f"{alpha:.2f} × {capability_score:.4f} + {(1-alpha):.2f} × {trust_score:.4f}"
     }
 
 # -------- MAIN MATCHING ENGINE --------
 
-def match_users_to_project(project_id: str, top_n: int = 5) -> List[Dict]:
+def quantized_semantic_similarity(
+    project_embedding: np.ndarray,
+    user_q: np.ndarray,
+    user_scale: np.ndarray
+) -> np.ndarray:
+    """
+    Cosine similarity against int8-quantized, row-normalized user embeddings.
+    
+    The project vector is normalized and quantized the same way; dot products
+    accumulate in int32 one chunk of rows at a time, then are rescaled.
+    
+    Returns:
+        np.ndarray: (N,) approximate cosine similarities
+    """
+    p = np.asarray(project_embedding, dtype=np.float32)
+    norm = np.sqrt(np.vdot(p, p))
+    if norm:
+        p = p / norm
+    p_q, p_scale = quantize_rows(p)
+    p_q = p_q[0].astype(np.int32)
+    
+    dots = np.empty(len(user_q), dtype=np.int32)
+    for start in range(0, len(user_q), QUANTIZED_CHUNK_ROWS):
+        chunk = user_q[start:start + QUANTIZED_CHUNK_ROWS]
+        dots[start:start + len(chunk)] = chunk.astype(np.int32) @ p_q
+    return dots * (user_scale * p_scale[0])
+
+def ann_semantic_search(project_embedding: np.ndarray, k: int, n_users: int):
+    """
+    Approximate top-k users from the FAISS HNSW index.
+    
+    Returns:
+        Tuple[similarities, row_indices], or None if the index is missing or stale
+    """
+    from external.index import USER_INDEX_FILE, index_is_fresh, search_user_index
+    
+    if not index_is_fresh(USER_EMBEDDINGS_STORE):
+        return None
+    index = _load_user_index(os.path.getmtime(USER_INDEX_FILE))
+    if index.ntotal != n_users:
+        return None
+    return search_user_index(index, project_embedding, k)
+
+def top_k_indices(similarities: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest similarities, best first, via an O(N) partial sort.
+    """
+    if k >= len(similarities):
+        return np.argsort(-similarities, kind="stable")
+    idx = np.argpartition(-similarities, k)[:k]
+    return idx[np.argsort(-similarities[idx], kind="stable")]
+
+def match_users_to_project(project_id: str, top_n: int = 5, candidate_pool: int = None) -> List[Dict]:
     """
     Two-layer matching algorithm:
     1. Semantic Relevance Filter (hard gate)
@@ -410,6 +686,8 @@ def match_users_to_project(project_id: str, top_n: int = 5) -> List[Dict]:
     Args:
         project_id: Project ID to match users for
         top_n: Number of top matches to return (default: 5)
+        candidate_pool: If set, only the candidate_pool most similar users are
+            gated and scored (default: every user)
     
     Returns:
         List[Dict]: Top N ranked matches with full score breakdown
@@ -417,7 +695,10 @@ def match_users_to_project(project_id: str, top_n: int = 5) -> List[Dict]:
     
     # Load data
     project_embeddings = load_project_embeddings()
-    user_embeddings = load_user_embeddings()
+    if SEMANTIC_GATE_INT8:
+        user_meta, user_q, user_scale = load_user_matrix_int8()
+    else:
+        user_meta, user_matrix = load_user_matrix()
     
     if project_id not in project_embeddings:
         print(f"❌ Project {project_id} not found")
@@ -448,29 +729,60 @@ def match_users_to_project(project_id: str, top_n: int = 5) -> List[Dict]:
     
     phase1_passes = []
     
-    for user_id, user_data in user_embeddings.items():
-        user_embedding = user_data["embedding"]
-        resume_file = user_data.get("resume_file", user_id)
-        
-        # Apply semantic filter
-        passes_filter, similarity, interpretation = semantic_relevance_filter(
-            project_embedding, user_embedding
-        )
-        
-        if passes_filter:
-            phase1_passes.append({
-                "user_id": user_id,
-                "resume_file": resume_file,
-                "semantic_score": similarity,
-                "interpretation": interpretation,
-                "user_data": user_data,
-                "user_json": load_user_json(resume_file)
-            })
-            print(f"  ✓ {user_id:<20} {similarity:.4f} ({interpretation})")
+    ann_result = None
+    if user_meta and candidate_pool and SEMANTIC_GATE_ANN:
+        ann_result = ann_semantic_search(project_embedding, candidate_pool, len(user_meta))
+    
+    if ann_result is not None:
+        # Sub-linear HNSW search; only the returned pool has similarities
+        pool_sims, pool_idx = ann_result
+        similarities = np.zeros(len(user_meta), dtype=np.float32)
+        similarities[pool_idx] = pool_sims
+        passing_idx = pool_idx[semantic_gate_mask(pool_sims)]
+    elif user_meta:
+        # One matmul over all row-normalized user embeddings instead of a per-user cosine
+        if SEMANTIC_GATE_INT8:
+            similarities = quantized_semantic_similarity(project_embedding, user_q, user_scale)
+        else:
+            similarities = batch_semantic_similarity(project_embedding, user_matrix)
+        if candidate_pool:
+            pool_idx = top_k_indices(similarities, candidate_pool)
+            passing_idx = pool_idx[semantic_gate_mask(similarities[pool_idx])]
         else:
-            print(f"  ✗ {user_id:<20} {similarity:.4f} ({interpretation})")
+            passing_idx = np.flatnonzero(semantic_gate_mask(similarities))
+    else:
+        similarities = np.empty(0, dtype=np.float32)
+        passing_idx = []
     
-    print(f"\nPhase 1 Result: {len(phase1_passes)} / {len(user_embeddings)} users passed\n")
+    for i in passing_idx:
+        if SEMANTIC_GATE_INT8:
+            embedding = user_q[i].astype(np.float32) * user_scale[i]
+        else:
+            embedding = user_matrix[i]
+        user_data = {**user_meta[i], "embedding": embedding}
+        user_id = user_data["user_id"]
+        resume_file = user_data.get("resume_file", user_id)
+        similarity = float(similarities[i])
+        _, interpretation = interpret_similarity(similarity)
+        
+        phase1_passes.append({
+            "user_id": user_id,
+            "resume_file": resume_file,
+            "semantic_score": similarity,
+            "interpretation": interpretation,
+            "user_data": user_data
+        })
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"  ✓ {user_id:<20} {similarity:.4f} ({interpretation})")
+    
+    # Load candidate resume JSONs concurrently; file reads release the GIL
+    if phase1_passes:
+        with ThreadPoolExecutor(max_workers=USER_JSON_LOAD_WORKERS) as executor:
+            user_jsons = executor.map(load_user_json, [c["resume_file"] for c in phase1_passes])
+            for candidate, user_json in zip(phase1_passes, user_jsons):
+                candidate["user_json"] = user_json
+    
+    print(f"\nPhase 1 Result: {len(phase1_passes)} / {len(user_meta)} users passed\n")
     
     if not phase1_passes:
         print("⚠️  No users passed semantic relevance filter")
@@ -480,7 +792,11 @@ def match_users_to_project(project_id: str, top_n: int = 5) -> List[Dict]:
     print("PHASE 2: TWO-LAYER SCORING")
     print("Layer 1: Capability & Alignment | Layer 2: Trust & Execution\n")
     
-    for candidate in phase1_passes:
+    # Skill overlap for every candidate in one sparse matmul
+    vocab, skill_matrix = build_skill_matrix([c["user_json"] for c in phase1_passes])
+    skill_scores = batch_skill_match(required_skills, vocab, skill_matrix)
+    
+    for candidate, skill_score in zip(phase1_passes, skill_scores):
         user_id = candidate["user_id"]
         resume_file = candidate["resume_file"]
         user_json = candidate["user_json"]
@@ -498,7 +814,9 @@ def match_users_to_project(project_id: str, top_n: int = 5) -> List[Dict]:
             project_type,
             required_skills,
             skills,
-            experience.get("overall", "beginner")
+            experience.get("overall", "beginner"),
+            semantic_score=candidate["semantic_score"],
+            skill_score=float(skill_score)
         )
         
         # -------- LAYER 2: TRUST AND EXECUTION --------
@@ -551,15 +869,16 @@ if __name__ == "__main__":
     import sys
     
     if len(sys.argv) < 2:
-        print("❌ Usage: python match_users_to_projects.py <project_id> [top_n]")
+        print("❌ Usage: python match_users_to_projects.py <project_id> [top_n] [candidate_pool]")
         print("Example: python match_users_to_projects.py proj_694740e0 10")
         sys.exit(1)
     
     project_id = sys.argv[1]
     top_n = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    candidate_pool = int(sys.argv[3]) if len(sys.argv) > 3 else None
     
     # Run matching algorithm
-    matches = match_users_to_project(project_id, top_n=top_n)
+    matches = match_users_to_project(project_id, top_n=top_n, candidate_pool=candidate_pool)
     
     print(f"\n✅ Found {len(matches)} matches for project {project_id}")
     for idx, match in enumerate(matches, 1):
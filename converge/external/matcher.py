@@ -1,21 +1,5 @@
 import numpy as np
 from typing import List, Dict
-from sklearn.metrics.pairwise import cosine_similarity
-
-
-# -----------------------------
-# Utility functions
-# -----------------------------
-
-def cosine_sim(vec1, vec2) -> float:
-    return cosine_similarity(
-        np.array(vec1).reshape(1, -1),
-        np.array(vec2).reshape(1, -1)
-    )[0][0]
-
-
-def normalize(value, min_val=0.0, max_val=1.0):
-    return max(min_val, min(max_val, value))
 
 
 # -----------------------------
@@ -29,40 +13,36 @@ def skill_match_score(project_skills: List[str], user_skills: List[str]) -> floa
     return len(intersection) / len(project_skills)
 
 
-def experience_alignment_score(user_level: str, project_type: str) -> float:
-    mapping = {
-        "beginner": 0.6,
-        "intermediate": 1.0,
-        "advanced": 0.9
-    }
-    base = mapping.get(user_level, 0.6)
+# -----------------------------
+# Vectorized scoring components
+# -----------------------------
 
-    if project_type == "research" and user_level == "beginner":
-        return 0.4
-    return base
+# Weights of the final composite score (see MATCHING_ALGORITHM.md)
+FINAL_WEIGHTS = np.array([0.50, 0.18, 0.12, 0.08, 0.07, 0.05])
 
+EXPERIENCE_SCORES = {"beginner": 0.6, "intermediate": 1.0, "advanced": 0.9}
+AVAILABILITY_SCORES = {"high": 1.0, "medium": 0.7, "low": 0.4}
 
-def year_compatibility_score(user_year: int, preferred_year: int = None) -> float:
-    if preferred_year is None:
-        return 1.0
-    diff = abs(user_year - preferred_year)
-    return normalize(1 - 0.25 * diff)
+
+def cosine_sim_batch(vec, matrix) -> np.ndarray:
+    """Cosine similarity of one vector against every row of a matrix in a single matmul."""
+    vec = np.asarray(vec, dtype=np.float32)
+    matrix = np.asarray(matrix, dtype=np.float32)
+    denom = np.sqrt(np.einsum("ij,ij->i", matrix, matrix) * np.vdot(vec, vec))
+    sims = matrix @ vec
+    return np.divide(sims, denom, out=np.zeros_like(sims), where=denom != 0)
 
 
-def reputation_score(avg_rating: float, completed_projects: int) -> float:
-    if completed_projects == 0:
-        return 0.5
-    confidence = min(1.0, completed_projects / 5)
-    return normalize((avg_rating / 5) * confidence)
+def year_compatibility_scores(user_years: np.ndarray, preferred_year: int = None) -> np.ndarray:
+    if preferred_year is None:
+        return np.ones(len(user_years))
+    return np.clip(1 - 0.25 * np.abs(user_years - preferred_year), 0.0, 1.0)
 
 
-def availability_score(availability: str) -> float:
-    mapping = {
-        "high": 1.0,
-        "medium": 0.7,
-        "low": 0.4
-    }
-    return mapping.get(availability.lower(), 0.7)
+def reputation_scores(avg_ratings: np.ndarray, completed_projects: np.ndarray) -> np.ndarray:
+    confidence = np.minimum(1.0, completed_projects / 5)
+    scores = np.clip((avg_ratings / 5) * confidence, 0.0, 1.0)
+    return np.where(completed_projects == 0, 0.5, scores)
 
 
 # -----------------------------
@@ -77,66 +57,71 @@ def match_users_to_project(
     top_k: int = 5
 ) -> List[Dict]:
 
-    results = []
+    if not users:
+        return []
 
     project_skills = project_json["requirements"].get("required_skills", [])
     project_type = project_json["metadata"].get("project_type", "hackathon")
 
-    for user in users:
-        user_embedding = user["embedding"]
+    # ---- Phase 1: Semantic gate ----
+    semantic_scores = cosine_sim_batch(project_embedding, [user["embedding"] for user in users])
+    passing = np.where(semantic_scores >= semantic_threshold)[0]  # others are DISCARDED
+    if len(passing) == 0:
+        return []
 
-        # ---- Phase 1: Semantic gate ----
-        semantic_score = cosine_sim(project_embedding, user_embedding)
+    candidates = [users[i] for i in passing]
 
-        if semantic_score < semantic_threshold:
-            continue  # DISCARD USER
-
-        # ---- Phase 2: Structured scoring ----
-        user_skills = (
+    # ---- Phase 2: Structured scoring, one array per signal ----
+    skill_scores = np.array([
+        skill_match_score(
+            project_skills,
             user["skills"]["programming_languages"]
             + user["skills"]["frameworks_libraries"]
             + user["skills"]["domain_skills"]
         )
-
-        skill_score = skill_match_score(project_skills, user_skills)
-
-        experience_score = experience_alignment_score(
-            user["experience_level"]["overall"],
-            project_type
-        )
-
-        year_score = year_compatibility_score(
-            int(user["profile"].get("year", 0))
-        )
-
-        reputation = reputation_score(
-            user["reputation_signals"]["average_rating"],
-            user["reputation_signals"]["completed_projects"]
-        )
-
-        availability = availability_score(
-            user["profile"].get("availability", "medium")
-        )
-
-        # ---- Final weighted score ----
-        final_score = (
-            0.50 * semantic_score +
-            0.18 * skill_score +
-            0.12 * experience_score +
-            0.08 * year_score +
-            0.07 * reputation +
-            0.05 * availability
-        )
-
-        results.append({
-            "user_id": user["profile"]["user_id"],
-            "name": user["profile"]["name"],
-            "final_score": round(final_score, 4),
-            "semantic_score": round(semantic_score, 4),
-            "skill_score": round(skill_score, 4),
-            "experience_score": round(experience_score, 4)
-        })
+        for user in candidates
+    ])
+
+    experience_levels = [user["experience_level"]["overall"] for user in candidates]
+    experience_scores = np.array([EXPERIENCE_SCORES.get(level, 0.6) for level in experience_levels])
+    if project_type == "research":
+        experience_scores[[level == "beginner" for level in experience_levels]] = 0.4
+
+    year_scores = year_compatibility_scores(
+        np.array([int(user["profile"].get("year", 0)) for user in candidates])
+    )
+
+    reputation = reputation_scores(
+        np.array([user["reputation_signals"]["average_rating"] for user in candidates], dtype=float),
+        np.array([user["reputation_signals"]["completed_projects"] for user in candidates], dtype=float)
+    )
+
+    availability = np.array([
+        AVAILABILITY_SCORES.get(user["profile"].get("availability", "medium").lower(), 0.7)
+        for user in candidates
+    ])
+
+    # ---- Final weighted score ----
+    signals = np.stack([
+        semantic_scores[passing],
+        skill_scores,
+        experience_scores,
+        year_scores,
+        reputation,
+        availability
+    ])
+    final_scores = FINAL_WEIGHTS @ signals
 
     # Sort and return top K
-    results.sort(key=lambda x: x["final_score"], reverse=True)
-    return results[:top_k]
+    order = np.argsort(-final_scores, kind="stable")[:top_k]
+    return [
+        {
+            "user_id": candidates[i]["profile"]["user_id"],
+            "name": candidates[i]["profile"]["name"],
+            "final_score": round(float(final_scores[i]), 4),
+            "semantic_score": round(float(semantic_scores[passing[i]]), 4),
+            "skill_score": round(float(skill_scores[i]), 4),
+            "experience_score": round(float(experience_scores[i]), 4)
+        }
+        for i in order
+    ]
@@ -0,0 +1,43 @@
+import os
+import sys
+import orjson
+from external.embedding_store import save_embedding_store, store_paths
+
+# -------- CONFIG --------
+STORES = {
+    "user_embeddings": "user_embeddings.json",
+    "project_embeddings": "project_embeddings.json",
+}
+
+# -------- MIGRATION --------
+def migrate_embeddings(json_file: str, store_name: str) -> int:
+    """
+    Rewrite a JSON list of embedding records into an .npy matrix + metadata JSON.
+
+    Args:
+        json_file: Source JSON file (list of records with "embedding")
+        store_name: Target store name
+
+    Returns:
+        int: Number of records migrated
+    """
+    with open(json_file, "rb") as f:
+        records = orjson.loads(f.read())
+    save_embedding_store(records, store_name)
+    return len(records)
+
+# -------- MAIN --------
+if __name__ == "__main__":
+    migrated = 0
+    for store_name, json_file in STORES.items():
+        if not os.path.exists(json_file):
+            print(f"⚠️  {json_file} not found, skipping")
+            continue
+        count = migrate_embeddings(json_file, store_name)
+        npy_path, meta_path = store_paths(store_name)
+        print(f"✅ {json_file} → {npy_path} + {meta_path} ({count} records)")
+        migrated += 1
+
+    if not migrated:
+        print("❌ Nothing to migrate")
+        sys.exit(1)
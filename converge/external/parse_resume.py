@@ -1,26 +1,69 @@
+import io
 import os
 import json
 import re
+import orjson
 import time
-from google import genai
+import random
+import asyncio
+import hashlib
+import logging
+import django
+from django.apps import apps
+from typing import List
+from external.genai_client import get_client
+
+# Configure Django if not already configured
+if not apps.ready:
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'converge.settings')
+    django.setup()
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
 
 # ---------------- CONFIG ---------------- #
 
-MODEL_NAME = "models/gemma-3-12b-it"
+MODEL_NAME = "models/gemma-3-12b-it"  # fallback tier: slower, but tolerant of the repair path
+# Fast tier tried first in JSON mode; its output must parse cleanly and carry every
+# top-level schema key, otherwise the resume is re-parsed with MODEL_NAME.
+# Set GEMINI_FAST_MODEL="" to always use MODEL_NAME.
+FAST_MODEL_NAME = os.getenv("GEMINI_FAST_MODEL", "models/gemini-2.5-flash-lite")
 MAX_RETRIES = 3
-RETRY_DELAY = 2  # seconds
+RETRY_DELAY = 2  # seconds, base of the jittered exponential backoff
+MAX_RETRY_DELAY = 60  # seconds, cap on any single backoff sleep
+TRANSIENT_STATUS_CODES = {408, 429}  # 4xx responses worth retrying; other 4xx fail fast
+PARSE_CONCURRENCY = 8  # generate_content requests in flight for batch parsing
+GENERATION_CONFIG = {
+    "temperature": 0,
+    "top_p": 1,
+    "top_k": 1,
+    "max_output_tokens": 2048,
+}
+# Gemma models reject JSON mode; FAST_GENERATION_CONFIG (structured output) is built below RESUME_SCHEMA
+
+# LLM JSON repair patterns used by extract_json
+_RE_JSON_BLOCK = re.compile(r"\{.*\}", re.DOTALL)
+_RE_TRAILING_COMMA = re.compile(r',(\s*[}\]])')
+_RE_MISSING_COMMA = re.compile(r'(["\d\]}])\s*\n\s*"')
+_RE_UNESCAPED_QUOTE = re.compile(r'(?<!\\)"(?=\s*[^:,}\]])')
+
+# Parsed resumes are cached by sha256(model | schema version | resume text);
+# bump RESUME_SCHEMA_VERSION whenever RESUME_SCHEMA or the prompt changes
+RESUME_SCHEMA_VERSION = "v3"
+PARSE_CACHE_TTL = 30 * 86400  # seconds
 
 INPUT_FILE = "RESUME_UJJWALCHORARIA.txt"
 OUTPUT_FILE = "resume_json.json"
 
 # ---------------- GEMINI SETUP ---------------- #
 
-API_KEY = os.getenv("GEMINI_API_KEY")
-if not API_KEY:
-    raise EnvironmentError("❌ GEMINI_API_KEY not set in environment")
-
-# New google-genai client
-CLIENT = genai.Client(api_key=API_KEY)
+def _get_client():
+    """Shared google-genai client (pooled connections), created on first use."""
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise EnvironmentError("❌ GEMINI_API_KEY not set in environment")
+    return get_client(api_key)
 
 # ---------------- SCHEMA ---------------- #
 
@@ -103,33 +146,69 @@ RESUME_SCHEMA = {
 
 }
 
+def _response_schema(example):
+    """
+    Gemini response schema mirroring an example value from RESUME_SCHEMA.
+
+    "a | b" placeholders and example string lists are described as their allowed
+    values (kept as plain strings so "" stays valid for absent fields) and every
+    object key is required, so structured output always comes back in the same
+    shape as RESUME_SCHEMA.
+    """
+    if isinstance(example, dict):
+        return {
+            "type": "OBJECT",
+            "properties": {key: _response_schema(value) for key, value in example.items()},
+            "required": list(example),
+            "property_ordering": list(example),
+        }
+    if isinstance(example, list):
+        if example and isinstance(example[0], dict):
+            return {"type": "ARRAY", "items": _response_schema(example[0])}
+        if example:
+            return {"type": "ARRAY", "items": {"type": "STRING", "description": "one of: " + ", ".join(example)}}
+        return {"type": "ARRAY", "items": {"type": "STRING"}}
+    if isinstance(example, bool):
+        return {"type": "BOOLEAN"}
+    if isinstance(example, int):
+        return {"type": "INTEGER"}
+    if isinstance(example, float):
+        return {"type": "NUMBER"}
+    if " | " in example:
+        return {"type": "STRING", "description": "one of: " + ", ".join(example.split(" | ")) + ", or \"\""}
+    return {"type": "STRING"}
+
+# Fast tier: native structured output, so its JSON is well-formed and schema-shaped
+FAST_GENERATION_CONFIG = {
+    **GENERATION_CONFIG,
+    "response_mime_type": "application/json",
+    "response_schema": _response_schema(RESUME_SCHEMA),
+}
+
+# Serialized once, without indentation: whitespace is billed as input tokens on every call
+_SCHEMA_JSON = orjson.dumps(RESUME_SCHEMA).decode()
+# Compact snapshot of the schema used to mint fresh fallback results
+_EMPTY_PARSED_JSON = orjson.dumps(RESUME_SCHEMA)
+
+def _blank_schema() -> dict:
+    """Independent deep copy of RESUME_SCHEMA (the minimal fallback on parse failure)."""
+    return orjson.loads(_EMPTY_PARSED_JSON)
+
 # ---------------- PROMPT BUILDER ---------------- #
 
 def build_prompt(resume_text: str) -> str:
-    return f"""
-You are an expert resume parser.
-
-TASK:
-- Convert raw OCR resume text into structured JSON
-- Follow the schema EXACTLY
-- DO NOT infer, guess, assume, or hallucinate any data.
-- If a field is not present in the resume, return an empty string ("") or an empty array ([]).
+    return f"""You are an expert resume parser. Convert the raw OCR resume text into JSON that follows the schema EXACTLY.
+- Extract ONLY information explicitly present in the text. DO NOT infer, guess or create skills, projects, experience levels or interests.
+- Use "" or [] for fields not present in the resume.
 - Normalize extracted terms where possible (e.g., "C++" instead of "cplusplus").
-- Infer project domains from descriptions
-- Return ONLY valid JSON
-- No markdown, no explanations, no extra text
-- Extract ONLY information that is explicitly present in the text.
-- DO NOT create synthetic skills, projects, experience levels, or interests.
-
-
+- Infer project domains from descriptions.
+- Return ONLY valid JSON: no markdown, no explanations, no extra text.
 
 RESUME TEXT:
-----------------
 {resume_text}
-----------------
 
-REQUIRED JSON SCHEMA:
-{json.dumps(RESUME_SCHEMA, indent=2)}
+JSON SCHEMA:
+{_SCHEMA_JSON}
 """
 
 # ---------------- JSON CLEANER ---------------- #
@@ -141,13 +220,13 @@ def extract_json(text: str) -> dict:
     """
     # Try direct parse
     try:
-        return json.loads(text)
-    except json.JSONDecodeError as e:
-        print(f"[parse_resume] Direct JSON parse failed: {e}")
+        return orjson.loads(text)
+    except orjson.JSONDecodeError as e:
+        logger.debug(f"[parse_resume] Direct JSON parse failed: {e}")
         pass
 
     # Extract JSON between first { and last }
-    match = re.search(r"\{.*\}", text, re.DOTALL)
+    match = _RE_JSON_BLOCK.search(text)
     if not match:
         raise ValueError("❌ No JSON object found in LLM response")
 
@@ -155,59 +234,282 @@ def extract_json(text: str) -> dict:
     
     # Try parsing extracted JSON
     try:
-        return json.loads(json_str)
-    except json.JSONDecodeError as e:
-        print(f"[parse_resume] Extracted JSON parse failed at char {e.pos}: {e.msg}")
+        return orjson.loads(json_str)
+    except orjson.JSONDecodeError as e:
+        logger.debug(f"[parse_resume] Extracted JSON parse failed at char {e.pos}: {e.msg}")
         
         # Common fixes for LLM JSON issues
         # 1. Fix trailing commas
-        json_str = re.sub(r',(\s*[}\]])', r'\1', json_str)
+        json_str = _RE_TRAILING_COMMA.sub(r'\1', json_str)
         
         # 2. Fix missing commas between items
-        json_str = re.sub(r'(["\d\]}])\s*\n\s*"', r'\1,\n"', json_str)
+        json_str = _RE_MISSING_COMMA.sub(r'\1,\n"', json_str)
         
         # 3. Fix unescaped quotes in strings (basic)
-        json_str = re.sub(r'(?<!\\)"(?=\s*[^:,}\]])', r'\\"', json_str)
+        json_str = _RE_UNESCAPED_QUOTE.sub(r'\\"', json_str)
         
         try:
-            return json.loads(json_str)
-        except json.JSONDecodeError as e2:
+            return orjson.loads(json_str)
+        except orjson.JSONDecodeError as e2:
             # Still failed, return minimal valid structure
-            print(f"[parse_resume] JSON repair failed, returning minimal schema")
-            return RESUME_SCHEMA.copy()
+            logger.warning("[parse_resume] JSON repair failed, returning minimal schema")
+            return _blank_schema()
+
+# ---------------- STREAM SCANNER ---------------- #
+
+class JsonStreamScanner:
+    """
+    Brace-depth state machine over streamed model output.
+
+    feed() returns True as soon as the first top-level JSON object closes, so the
+    caller can stop reading the stream instead of waiting for the last token.
+    Braces inside strings (including escaped quotes) are ignored.
+    """
+
+    def __init__(self):
+        self.buf = io.StringIO()
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.pos = 0
+        self.start = -1
+        self.end = -1
+
+    def feed(self, delta: str) -> bool:
+        self.buf.write(delta)
+        for ch in delta:
+            self.pos += 1
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = self.start >= 0
+            elif ch == "{":
+                if self.start < 0:
+                    self.start = self.pos - 1
+                self.depth += 1
+            elif ch == "}" and self.depth > 0:
+                self.depth -= 1
+                if self.depth == 0:
+                    self.end = self.pos
+                    return True
+        return False
+
+    def text(self) -> str:
+        return self.buf.getvalue()
+
+    def closed_object(self) -> str:
+        """The first complete top-level {...} seen so far ("" if none)."""
+        return self.text()[self.start:self.end] if self.end > 0 else ""
+
+def _finish(scanner: JsonStreamScanner) -> dict:
+    text = scanner.text()
+    logger.debug(f"[parse_resume] Response length: {len(text)} chars")
+
+    parsed_json = None
+    if scanner.end > 0:
+        try:
+            parsed_json = orjson.loads(scanner.closed_object())
+        except orjson.JSONDecodeError:
+            pass
+    if parsed_json is None:
+        # Stream ended without a clean close (or the object was malformed): regex repair
+        parsed_json = extract_json(text)
+    logger.debug(f"[parse_resume] Successfully parsed JSON with {len(parsed_json)} keys")
+    return parsed_json
+
+def _validated(scanner: JsonStreamScanner) -> dict:
+    """Strict parse for the fast tier: no regex repair, every top-level schema key present."""
+    try:
+        parsed_json = orjson.loads(scanner.closed_object() or scanner.text())
+    except orjson.JSONDecodeError as e:
+        raise ValueError(f"invalid JSON at char {e.pos}") from e
+    if not isinstance(parsed_json, dict) or not RESUME_SCHEMA.keys() <= parsed_json.keys():
+        raise ValueError("JSON does not match the resume schema")
+    return parsed_json
+
+# ---------------- MODEL CALLS ---------------- #
+
+def _generate(model: str, config: dict, prompt: str) -> JsonStreamScanner:
+    scanner = JsonStreamScanner()
+    stream = _get_client().models.generate_content_stream(model=model, contents=prompt, config=config)
+    try:
+        for chunk in stream:
+            if scanner.feed(chunk.text or ""):
+                break  # top-level object closed; don't wait for trailing tokens
+    finally:
+        stream.close()
+    return scanner
+
+async def _agenerate(model: str, config: dict, prompt: str) -> JsonStreamScanner:
+    scanner = JsonStreamScanner()
+    stream = await _get_client().aio.models.generate_content_stream(model=model, contents=prompt, config=config)
+    try:
+        async for chunk in stream:
+            if scanner.feed(chunk.text or ""):
+                break
+    finally:
+        await stream.aclose()
+    return scanner
+
+def _parse_tiered(prompt: str) -> dict:
+    if FAST_MODEL_NAME:
+        try:
+            parsed_json = _validated(_generate(FAST_MODEL_NAME, FAST_GENERATION_CONFIG, prompt))
+            logger.info(f"[parse_resume] Parsed with {FAST_MODEL_NAME}")
+            return parsed_json
+        except Exception as e:
+            logger.info(f"[parse_resume] {FAST_MODEL_NAME} failed ({e}); falling back to {MODEL_NAME}")
+    parsed_json = _finish(_generate(MODEL_NAME, GENERATION_CONFIG, prompt))
+    logger.info(f"[parse_resume] Parsed with {MODEL_NAME}")
+    return parsed_json
+
+async def _aparse_tiered(prompt: str) -> dict:
+    if FAST_MODEL_NAME:
+        try:
+            parsed_json = _validated(await _agenerate(FAST_MODEL_NAME, FAST_GENERATION_CONFIG, prompt))
+            logger.info(f"[parse_resume] Parsed with {FAST_MODEL_NAME}")
+            return parsed_json
+        except Exception as e:
+            logger.info(f"[parse_resume] {FAST_MODEL_NAME} failed ({e}); falling back to {MODEL_NAME}")
+    parsed_json = _finish(await _agenerate(MODEL_NAME, GENERATION_CONFIG, prompt))
+    logger.info(f"[parse_resume] Parsed with {MODEL_NAME}")
+    return parsed_json
+
+# ---------------- PARSE CACHE ---------------- #
+
+def parse_cache_key(resume_text: str) -> str:
+    digest = hashlib.sha256(f"{FAST_MODEL_NAME}|{MODEL_NAME}|{RESUME_SCHEMA_VERSION}|{resume_text}".encode()).hexdigest()
+    return f"parse_resume:{digest}"
+
+def _cache_parsed(key: str, parsed_json: dict):
+    # The minimal-schema fallback means parsing failed; let the next call retry the model
+    if parsed_json != RESUME_SCHEMA:
+        cache.set(key, parsed_json, timeout=PARSE_CACHE_TTL)
+
+# ---------------- RETRY POLICY ---------------- #
+
+def _is_transient(error: Exception) -> bool:
+    """Client errors (bad key, invalid request) will fail the same way again."""
+    from google.genai import errors as genai_errors
+
+    if isinstance(error, genai_errors.ClientError):
+        return error.code in TRANSIENT_STATUS_CODES
+    return True
+
+def _server_retry_delay(error: Exception):
+    """Delay requested by the API via a Retry-After header or google.rpc.RetryInfo, if any."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    retry_after = headers.get("retry-after")
+    if retry_after is None:
+        details = getattr(error, "details", None)
+        details = details.get("error", details).get("details", []) if isinstance(details, dict) else []
+        retry_after = next(
+            (d.get("retryDelay", "").rstrip("s") for d in details if isinstance(d, dict) and d.get("retryDelay")),
+            None
+        )
+    try:
+        return float(retry_after) if retry_after is not None else None
+    except ValueError:
+        return None
+
+def _retry_delay(attempt: int, error: Exception) -> float:
+    """
+    Seconds to wait before the next attempt: the server's requested delay when
+    given, else full jitter, uniform(0, min(MAX_RETRY_DELAY, RETRY_DELAY ** attempt)),
+    so parallel workers hitting the same rate limit don't retry in lockstep.
+    """
+    server_delay = _server_retry_delay(error)
+    if server_delay is not None:
+        return min(MAX_RETRY_DELAY, server_delay)
+    return random.uniform(0, min(MAX_RETRY_DELAY, RETRY_DELAY ** attempt))
 
 # ---------------- PARSER ---------------- #
 
 def parse_resume(resume_text: str) -> dict:
+    key = parse_cache_key(resume_text)
+    cached = cache.get(key)
+    if cached is not None:
+        logger.debug("[parse_resume] Cache hit, skipping model call")
+        return cached
+
     for attempt in range(1, MAX_RETRIES + 1):
         try:
-            print(f"[parse_resume] Attempt {attempt}/{MAX_RETRIES}")
-            response = CLIENT.models.generate_content(
-                model=MODEL_NAME,
-                contents=build_prompt(resume_text),
-                config={
-                    "temperature": 0,
-                    "top_p": 1,
-                    "top_k": 1,
-                    "max_output_tokens": 2048,
-                },
-            )
-
-            response_text = getattr(response, "text", "")
-            print(f"[parse_resume] Response length: {len(response_text)} chars")
-            
-            parsed_json = extract_json(response_text)
-            print(f"[parse_resume] Successfully parsed JSON with {len(parsed_json)} keys")
+            logger.debug(f"[parse_resume] Attempt {attempt}/{MAX_RETRIES}")
+            parsed_json = _parse_tiered(build_prompt(resume_text))
+            _cache_parsed(key, parsed_json)
             return parsed_json
 
         except Exception as e:
-            print(f"⚠️ Attempt {attempt} failed: {e}")
-            if attempt < MAX_RETRIES:
-                print(f"[parse_resume] Retrying in {RETRY_DELAY}s...")
-                time.sleep(RETRY_DELAY)
+            logger.warning(f"[parse_resume] Attempt {attempt} failed: {e}")
+            if attempt < MAX_RETRIES and _is_transient(e):
+                delay = _retry_delay(attempt, e)
+                logger.debug(f"[parse_resume] Retrying in {delay:.1f}s...")
+                time.sleep(delay)
             else:
-                print("❌ All retries exhausted, returning minimal schema")
-                return RESUME_SCHEMA.copy()
+                logger.error("[parse_resume] Giving up, returning minimal schema")
+                return _blank_schema()
+
+async def _parse_resume_async(resume_text: str, semaphore: asyncio.Semaphore) -> dict:
+    for attempt in range(1, MAX_RETRIES + 1):
+        try:
+            logger.debug(f"[parse_resume] Attempt {attempt}/{MAX_RETRIES}")
+            async with semaphore:
+                return await _aparse_tiered(build_prompt(resume_text))
+
+        except Exception as e:
+            logger.warning(f"[parse_resume] Attempt {attempt} failed: {e}")
+            if attempt < MAX_RETRIES and _is_transient(e):
+                delay = _retry_delay(attempt, e)
+                logger.debug(f"[parse_resume] Retrying in {delay:.1f}s...")
+                await asyncio.sleep(delay)
+            else:
+                logger.error("[parse_resume] Giving up, returning minimal schema")
+                return _blank_schema()
+
+async def aparse_resume(resume_text: str, semaphore: asyncio.Semaphore) -> dict:
+    """
+    Async parse_resume for pipelines: parse cache first, then the model with at
+    most semaphore's worth of requests in flight across all callers. Cache reads
+    and writes are file I/O, so they run in a thread instead of on the event loop.
+    """
+    key = parse_cache_key(resume_text)
+    cached = await asyncio.to_thread(cache.get, key)
+    if cached is not None:
+        logger.debug("[parse_resume] Cache hit, skipping model call")
+        return cached
+    parsed_json = await _parse_resume_async(resume_text, semaphore)
+    await asyncio.to_thread(_cache_parsed, key, parsed_json)
+    return parsed_json
+
+def parse_resumes_batch(resume_texts: List[str], concurrency: int = PARSE_CONCURRENCY) -> List[dict]:
+    """
+    Parse many resumes with overlapping Gemini requests (at most `concurrency` in flight).
+
+    Each resume keeps its own prompt, retries and minimal-schema fallback, so one
+    bad resume never fails the batch. Previously parsed texts come from the parse
+    cache. Results are in the same order as resume_texts.
+    """
+    keys = [parse_cache_key(resume_text) for resume_text in resume_texts]
+    cached = cache.get_many(keys)
+    misses = [idx for idx, key in enumerate(keys) if key not in cached]
+    logger.info(f"[parse_resume] {len(resume_texts) - len(misses)}/{len(resume_texts)} resumes served from cache")
+
+    async def run():
+        semaphore = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*(
+            _parse_resume_async(resume_texts[idx], semaphore) for idx in misses
+        ))
+
+    parsed = asyncio.run(run()) if misses else []
+    for idx, parsed_json in zip(misses, parsed):
+        _cache_parsed(keys[idx], parsed_json)
+        cached[keys[idx]] = parsed_json
+    return [cached[key] for key in keys]
 
 # ---------------- MAIN ---------------- #
 
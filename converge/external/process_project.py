@@ -1,11 +1,14 @@
 import os
-import json
+import orjson
 from external.create_project import create_project_json, input_project_interactively
 from external.semantic_project import build_semantic_text_project
 from external.embed_project import embed_semantic_text_project
+from external.embedding_store import save_embedding_store
+from external.match_users_to_projects import clear_caches
 
 # -------- CONFIG --------
 PROJECT_EMBEDDINGS_FILE = "project_embeddings.json"
+PROJECT_EMBEDDINGS_STORE = "project_embeddings"  # .npy matrix + metadata read by the matcher
 PROJECT_JSONS_DIR = "project_jsons"
 
 # -------- HELPER FUNCTIONS --------
@@ -18,8 +21,8 @@ def ensure_project_jsons_dir():
 def load_project_embeddings():
     """Load existing project embeddings from file, or create empty list."""
     if os.path.exists(PROJECT_EMBEDDINGS_FILE):
-        with open(PROJECT_EMBEDDINGS_FILE, "r") as f:
-            data = json.load(f)
+        with open(PROJECT_EMBEDDINGS_FILE, "rb") as f:
+            data = orjson.loads(f.read())
             print(f"[DEBUG] Loaded {len(data)} existing projects from {PROJECT_EMBEDDINGS_FILE}")
             return data
     print(f"[DEBUG] No existing {PROJECT_EMBEDDINGS_FILE} found, starting fresh")
@@ -27,9 +30,10 @@ def load_project_embeddings():
 
 def save_project_embeddings(embeddings):
     """Save project embeddings to file."""
-    with open(PROJECT_EMBEDDINGS_FILE, "w") as f:
-        json.dump(embeddings, f, indent=2)
-    print(f"[DEBUG] Saved {len(embeddings)} projects to {PROJECT_EMBEDDINGS_FILE}")
+    with open(PROJECT_EMBEDDINGS_FILE, "wb") as f:
+        f.write(orjson.dumps(embeddings, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    save_embedding_store(embeddings, PROJECT_EMBEDDINGS_STORE)
+    print(f"[DEBUG] Saved {len(embeddings)} projects to {PROJECT_EMBEDDINGS_FILE} and {PROJECT_EMBEDDINGS_STORE}.npy")
 
 def find_project_index(project_embeddings, project_id):
     """Find index of project by project_id in embeddings list, or return -1 if not found."""
@@ -39,12 +43,13 @@ def find_project_index(project_embeddings, project_id):
     return -1
 
 # -------- MAIN PIPELINE --------
-def process_project(project_json: dict):
+def process_project(project_json: dict, embedding: list = None):
     """
     Complete pipeline: Project Details → JSON → Semantic Text → Embedding → Storage
     
     Args:
         project_json: Project JSON object
+        embedding: Optional precomputed embedding (e.g. from a batched embed call)
     
     Returns:
         dict: Project record with embedding
@@ -63,15 +68,17 @@ def process_project(project_json: dict):
     
     # Step 2: Generate embedding
     print("🧠 Step 2: Generating embedding...")
-    embedding = embed_semantic_text_project(semantic_text)
+    if embedding is None:
+        embedding = embed_semantic_text_project(semantic_text)
     print(f"✅ Embedding generated (dimension: {len(embedding)})\n")
     
     # Step 3: Save project JSON to directory
     print("💾 Step 3: Saving project JSON to directory...")
     ensure_project_jsons_dir()
     project_json_filename = os.path.join(PROJECT_JSONS_DIR, f"{project_id}.json")
-    with open(project_json_filename, "w") as f:
-        json.dump(project_json, f, indent=2)
+    with open(project_json_filename, "wb") as f:
+        f.write(orjson.dumps(project_json, option=orjson.OPT_INDENT_2))
+    clear_caches()
     print(f"✅ Project JSON saved to {project_json_filename}\n")
     
     # Step 4: Update project embeddings file
@@ -1,13 +1,16 @@
 import os
-import json
+import orjson
 import sys
 from external.ocr1 import extract_text_from_pdf
 from external.parse_resume import parse_resume
 from external.semantic import build_semantic_text
 from external.embed_resume import embed_semantic_text
+from external.embedding_store import save_embedding_store
+from external.match_users_to_projects import clear_caches, normalize_skills
 
 # -------- CONFIG --------
 USER_EMBEDDINGS_FILE = "user_embeddings.json"
+USER_EMBEDDINGS_STORE = "user_embeddings"  # .npy matrix + metadata read by the matcher
 RESUME_JSONS_DIR = "resume_jsons"
 
 # -------- HELPER FUNCTION --------
@@ -20,8 +23,8 @@ def ensure_resume_jsons_dir():
 def load_user_embeddings():
     """Load existing user embeddings from file, or create empty list."""
     if os.path.exists(USER_EMBEDDINGS_FILE):
-        with open(USER_EMBEDDINGS_FILE, "r") as f:
-            data = json.load(f)
+        with open(USER_EMBEDDINGS_FILE, "rb") as f:
+            data = orjson.loads(f.read())
             print(f"[DEBUG] Loaded {len(data)} existing users from {USER_EMBEDDINGS_FILE}")
             return data
     print(f"[DEBUG] No existing {USER_EMBEDDINGS_FILE} found, starting fresh")
@@ -29,9 +32,10 @@ def load_user_embeddings():
 
 def save_user_embeddings(embeddings):
     """Save user embeddings to file."""
-    with open(USER_EMBEDDINGS_FILE, "w") as f:
-        json.dump(embeddings, f, indent=2)
-    print(f"[DEBUG] Saved {len(embeddings)} users to {USER_EMBEDDINGS_FILE}")
+    with open(USER_EMBEDDINGS_FILE, "wb") as f:
+        f.write(orjson.dumps(embeddings, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    save_embedding_store(embeddings, USER_EMBEDDINGS_STORE)
+    print(f"[DEBUG] Saved {len(embeddings)} users to {USER_EMBEDDINGS_FILE} and {USER_EMBEDDINGS_STORE}.npy")
 
 def find_user_index(user_embeddings, resume_file):
     """Find index of user by resume_file in embeddings list, or return -1 if not found."""
@@ -40,13 +44,50 @@ def find_user_index(user_embeddings, resume_file):
             return idx
     return -1
 
+def save_resume_batch(processed):
+    """
+    Steps 5–6 for many resumes at once: one JSON file per resume, but a single
+    load and rewrite of the user embeddings storage for the whole batch.
+
+    Args:
+        processed: List of (pdf_path, resume_json, embedding) tuples
+
+    Returns:
+        list: User records, in the same order as processed
+    """
+    ensure_resume_jsons_dir()
+    user_embeddings = load_user_embeddings()
+    user_records = []
+    for pdf_path, resume_json, embedding in processed:
+        pdf_filename = os.path.splitext(os.path.basename(pdf_path))[0]
+        with open(os.path.join(RESUME_JSONS_DIR, f"{pdf_filename}.json"), "wb") as f:
+            f.write(orjson.dumps(resume_json, option=orjson.OPT_INDENT_2))
+
+        user_idx = find_user_index(user_embeddings, pdf_filename)
+        generated_user_id = user_embeddings[user_idx]["user_id"] if user_idx != -1 else f"user_{len(user_embeddings) + 1}"
+        user_record = {
+            "user_id": generated_user_id,
+            "embedding": embedding,
+            "resume_file": pdf_filename
+        }
+        if user_idx != -1:
+            user_embeddings[user_idx] = user_record
+        else:
+            user_embeddings.append(user_record)
+        user_records.append(user_record)
+
+    clear_caches()
+    save_user_embeddings(user_embeddings)
+    return user_records
+
 # -------- MAIN PIPELINE --------
-def process_resume(pdf_path):
+def process_resume(pdf_path, resume_json=None):
     """
     Complete pipeline: PDF → Text → JSON → Semantic → Embedding → Storage
     
     Args:
         pdf_path: Path to resume PDF file
+        resume_json: Already parsed resume JSON (skips OCR and parsing, e.g. from a batch)
     
     Returns:
         dict: User record with embeddings
@@ -56,18 +97,20 @@ def process_resume(pdf_path):
     print(f"PROCESSING RESUME: {pdf_path}")
     print(f"{'='*60}\n")
     
-    # Step 1: Extract text from PDF
-    print("📄 Step 1: Extracting text from PDF...")
-    resume_text = extract_text_from_pdf(pdf_path)
-    print(f"✅ Text extracted ({len(resume_text)} characters)\n")
-    
     # Get PDF filename (without extension) for storage
     pdf_filename = os.path.splitext(os.path.basename(pdf_path))[0]
     
-    # Step 2: Parse resume to JSON
-    print("🔍 Step 2: Parsing resume to JSON...")
-    resume_json = parse_resume(resume_text)
+    if resume_json is None:
+        # Step 1: Extract text from PDF
+        print("📄 Step 1: Extracting text from PDF...")
+        resume_text = extract_text_from_pdf(pdf_path)
+        print(f"✅ Text extracted ({len(resume_text)} characters)\n")
+        
+        # Step 2: Parse resume to JSON
+        print("🔍 Step 2: Parsing resume to JSON...")
+        resume_json = parse_resume(resume_text)
     user_id = resume_json.get("profile", {}).get("user_id", "unknown")
+    resume_json["_skills_norm"] = normalize_skills(resume_json.get("skills", {}))
     print(f"✅ Resume parsed for user: {user_id}\n")
     
     # Step 3: Build semantic text
@@ -84,8 +127,9 @@ def process_resume(pdf_path):
     print("💾 Step 5: Saving resume JSON to directory...")
     ensure_resume_jsons_dir()
     resume_json_filename = os.path.join(RESUME_JSONS_DIR, f"{pdf_filename}.json")
-    with open(resume_json_filename, "w") as f:
-        json.dump(resume_json, f, indent=2)
+    with open(resume_json_filename, "wb") as f:
+        f.write(orjson.dumps(resume_json, option=orjson.OPT_INDENT_2))
+    clear_caches()
     print(f"✅ Resume JSON saved to {resume_json_filename}\n")
     
     # Step 6: Update user embeddings file
@@ -1,3 +1,13 @@
+from functools import lru_cache
+from typing import Iterable, Tuple
+
+# -------- CONFIG --------
+SEMANTIC_TEXT_CACHE_SIZE = 4096
+
+def _unique_sorted(items: Iterable) -> Tuple:
+    """Sorted, de-duplicated items as a hashable tuple (same text as sorted(set(items)))."""
+    return tuple(sorted(set(items)))
+
 def build_semantic_text_project(project_json: dict) -> str:
     """
     Converts project JSON into semantic text for embedding.
@@ -8,42 +18,50 @@ def build_semantic_text_project(project_json: dict) -> str:
     Returns:
         str: Semantic text representation
     """
-    
+    return _build_semantic_text_project(
+        project_json.get("title") or "",
+        project_json.get("description") or "",
+        _unique_sorted(project_json.get("required_skills") or []),
+        _unique_sorted(project_json.get("preferred_technologies") or []),
+        _unique_sorted(project_json.get("domains") or []),
+        project_json.get("project_type") or ""
+    )
+
+@lru_cache(maxsize=SEMANTIC_TEXT_CACHE_SIZE)
+def _build_semantic_text_project(
+    title: str,
+    description: str,
+    required_skills: Tuple[str, ...],
+    preferred_tech: Tuple[str, ...],
+    domains: Tuple[str, ...],
+    project_type: str
+) -> str:
+    # Memoized on the fields that reach the text, so re-embedding an unchanged
+    # project (or a batch with duplicates) skips rebuilding the string
     sections = []
     
     # -------- PROJECT TITLE & DESCRIPTION --------
-    if project_json.get("title"):
-        sections.append(f"PROJECT TITLE:\n{project_json['title']}")
+    if title:
+        sections.append(f"PROJECT TITLE:\n{title}")
     
-    if project_json.get("description"):
-        sections.append(f"PROJECT DESCRIPTION:\n{project_json['description']}")
+    if description:
+        sections.append(f"PROJECT DESCRIPTION:\n{description}")
     
     # -------- PROJECT REQUIREMENTS --------
-    required_skills = project_json.get("required_skills", [])
     if required_skills:
-        sections.append(
-            "PROJECT REQUIREMENTS:\n" + ", ".join(sorted(set(required_skills)))
-        )
+        sections.append("PROJECT REQUIREMENTS:\n" + ", ".join(required_skills))
     
     # -------- PREFERRED TECHNOLOGIES --------
-    preferred_tech = project_json.get("preferred_technologies", [])
     if preferred_tech:
-        sections.append(
-            "PREFERRED TECHNOLOGIES:\n" + ", ".join(sorted(set(preferred_tech)))
-        )
+        sections.append("PREFERRED TECHNOLOGIES:\n" + ", ".join(preferred_tech))
     
     # -------- PROJECT DOMAINS --------
-    domains = project_json.get("domains", [])
     if domains:
-        sections.append(
-            "PROJECT DOMAINS:\n" + ", ".join(sorted(set(domains)))
-        )
+        sections.append("PROJECT DOMAINS:\n" + ", ".join(domains))
     
     # -------- PROJECT TYPE --------
-    if project_json.get("project_type"):
-        sections.append(
-            f"PROJECT TYPE:\n{project_json['project_type'].upper()}"
-        )
+    if project_type:
+        sections.append(f"PROJECT TYPE:\n{project_type.upper()}")
     
     # -------- FINAL SEMANTIC TEXT --------
     return "\n\n".join(sections)
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.7 on 2026-10-15 06:59
+
+import numpy as np
+from django.db import migrations, models
+
+
+def _unit_vector(embedding):
+    # Frozen copy of external.embedding_store.unit_vector so this migration never drifts with app code
+    matrix = np.array(embedding, dtype=np.float32).reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms)[0]
+
+
+def pack_existing(apps, schema_editor):
+    # Pack the (already unit-length) JSON embeddings into embedding_f32
+    Model = apps.get_model('projects', 'ProjectEmbedding')
+    batch = []
+    for row in Model.objects.exclude(embedding=[]).only('id', 'embedding').iterator(chunk_size=500):
+        row.embedding_f32 = _unit_vector(row.embedding).tobytes()
+        batch.append(row)
+        if len(batch) >= 500:
+            Model.objects.bulk_update(batch, ['embedding_f32'])
+            batch = []
+    if batch:
+        Model.objects.bulk_update(batch, ['embedding_f32'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_embedding_normalized'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectembedding',
+            name='embedding_f32',
+            field=models.BinaryField(blank=True, help_text='Unit-length embedding as packed float32 bytes', null=True),
+        ),
+        migrations.RunPython(pack_existing, migrations.RunPython.noop),
+    ]
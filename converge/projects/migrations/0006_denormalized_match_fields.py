@@ -0,0 +1,71 @@
+# Generated by Django 5.2.7 on 2026-10-15 07:13
+
+import converge.orjson_codec
+from django.db import migrations, models
+
+MATCH_FIELDS = ('project_type', 'title', 'description', 'required_skills', 'preferred_technologies', 'domains')
+
+
+def copy_match_fields(apps, schema_editor):
+    # Copy the keys matching reads from each stored project JSON onto its embedding row
+    Model = apps.get_model('projects', 'ProjectEmbedding')
+    ProjectJSON = apps.get_model('projects', 'ProjectJSON')
+    project_jsons = dict(ProjectJSON.objects.values_list('project_id', 'project_json'))
+    batch = []
+    for row in Model.objects.filter(project_id__in=list(project_jsons)).only('id', 'project_id').iterator(chunk_size=500):
+        project_json = project_jsons[row.project_id] or {}
+        for field in MATCH_FIELDS:
+            setattr(row, field, project_json.get(field))
+        row.denormalized = True
+        batch.append(row)
+        if len(batch) >= 500:
+            Model.objects.bulk_update(batch, ['denormalized', *MATCH_FIELDS])
+            batch = []
+    if batch:
+        Model.objects.bulk_update(batch, ['denormalized', *MATCH_FIELDS])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_embedding_f32'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectembedding',
+            name='denormalized',
+            field=models.BooleanField(default=False, help_text='Fields below are copied from the stored project JSON'),
+        ),
+        migrations.AddField(
+            model_name='projectembedding',
+            name='description',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='projectembedding',
+            name='domains',
+            field=models.JSONField(blank=True, decoder=converge.orjson_codec.OrjsonDecoder, encoder=converge.orjson_codec.OrjsonEncoder, null=True),
+        ),
+        migrations.AddField(
+            model_name='projectembedding',
+            name='preferred_technologies',
+            field=models.JSONField(blank=True, decoder=converge.orjson_codec.OrjsonDecoder, encoder=converge.orjson_codec.OrjsonEncoder, null=True),
+        ),
+        migrations.AddField(
+            model_name='projectembedding',
+            name='project_type',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='projectembedding',
+            name='required_skills',
+            field=models.JSONField(blank=True, decoder=converge.orjson_codec.OrjsonDecoder, encoder=converge.orjson_codec.OrjsonEncoder, null=True),
+        ),
+        migrations.AddField(
+            model_name='projectembedding',
+            name='title',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.RunPython(copy_match_fields, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from converge.orjson_codec import OrjsonDecoder, OrjsonEncoder
 
 
 class ProjectEmbedding(models.Model):
@@ -8,7 +9,17 @@ class ProjectEmbedding(models.Model):
 	"""
 	project_id = models.IntegerField(unique=True, db_index=True, help_text="Foreign key to Spring Boot project table")
 	semantic_text = models.TextField(blank=True, help_text="Reduced semantic representation")
-	embedding = models.JSONField(default=list, help_text="768-dim embedding vector")
+	embedding = models.JSONField(default=list, encoder=OrjsonEncoder, decoder=OrjsonDecoder, help_text="768-dim embedding vector")
+	normalized = models.BooleanField(default=False, help_text="embedding is stored L2-normalized (unit length)")
+	embedding_f32 = models.BinaryField(null=True, blank=True, help_text="Unit-length embedding as packed float32 bytes")
+	# Copies of the project JSON keys matching reads, so it never loads the full document
+	denormalized = models.BooleanField(default=False, help_text="Fields below are copied from the stored project JSON")
+	project_type = models.TextField(null=True, blank=True)
+	title = models.TextField(null=True, blank=True)
+	description = models.TextField(null=True, blank=True)
+	required_skills = models.JSONField(null=True, blank=True, encoder=OrjsonEncoder, decoder=OrjsonDecoder)
+	preferred_technologies = models.JSONField(null=True, blank=True, encoder=OrjsonEncoder, decoder=OrjsonDecoder)
+	domains = models.JSONField(null=True, blank=True, encoder=OrjsonEncoder, decoder=OrjsonDecoder)
 	created_at = models.DateTimeField(auto_now_add=True)
 	updated_at = models.DateTimeField(auto_now=True)
 
@@ -25,7 +36,7 @@ class ProjectEmbedding(models.Model):
 class ProjectJSON(models.Model):
 	"""Stores canonical project JSON provided by the Spring Boot backend."""
 	project_id = models.IntegerField(unique=True, db_index=True, help_text="Foreign key to Spring Boot project table")
-	project_json = models.JSONField(default=dict, help_text="Canonical project JSON payload")
+	project_json = models.JSONField(default=dict, encoder=OrjsonEncoder, decoder=OrjsonDecoder, help_text="Canonical project JSON payload")
 	created_at = models.DateTimeField(auto_now_add=True)
 	updated_at = models.DateTimeField(auto_now=True)
 
@@ -11,6 +11,14 @@ class ProjectEmbeddingInputSerializer(serializers.Serializer):
 #it simply takes project_id and parsed_json as input fields
 #from the incoming request in json format.
 
+class MatchQuerySerializer(serializers.Serializer):
+	"""Query parameters for project matching"""
+	top = serializers.IntegerField(required=False, default=5, min_value=1, max_value=500)
+	pool = serializers.IntegerField(required=False, min_value=1, max_value=1500)
+
+#Validates ?top= and ?pool= for match_project, capping both so a request
+#cannot ask Phase 2 to score an unbounded number of resumes.
+
 class ProjectEmbeddingSerializer(serializers.ModelSerializer):
 	"""Output with embedding data"""
 	class Meta:
@@ -0,0 +1,357 @@
+import logging
+import os
+import threading
+import time
+import orjson
+import numpy as np
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Count, Max
+from resumes.models import ResumeEmbedding
+from external.embedding_store import EMBEDDING_DIM, normalize_rows, quantize_rows, unpack_embedding
+from external.match_users_to_projects import batch_semantic_similarity, semantic_gate_mask
+
+logger = logging.getLogger(__name__)
+
+# HNSW index over every embedded resume, persisted under MATCH_FAISS_INDEX_DIR so
+# worker processes and restarts reuse it instead of rebuilding from the database
+RESUME_INDEX_FILE = os.path.join(settings.MATCH_FAISS_INDEX_DIR, "resume_index.faiss")
+RESUME_INDEX_STATE_FILE = os.path.join(settings.MATCH_FAISS_INDEX_DIR, "resume_index.json")
+INDEX_BUILD_CHUNK = 2000
+# Seconds between checks of the index against ResumeEmbedding; newly embedded
+# resumes become searchable within this window
+INDEX_CHECK_INTERVAL = 30
+
+# int8 similarities are within ~1e-3 of float32; resumes scoring within this margin
+# of the gate are rescored exactly before the gate is applied
+INT8_RESCORE_MARGIN = 0.02
+
+_index = None
+_index_state = None  # {"count": rows indexed, "latest": newest updated_at indexed}
+_index_lock = threading.Lock()
+_index_checked_at = None  # time.monotonic() of the last freshness check
+_rebuild_thread = None
+
+_cupy_module = False  # False until probed, then the cupy module or None
+_gpu_matrix = None  # (embedding state, resume_ids, (N, 768) float32 device matrix)
+_gpu_lock = threading.Lock()
+
+
+def resume_gate_matrix(rows):
+	"""
+	Stack (resume_id, embedding_f32) rows into an (N, 768) unit-length float32 matrix.
+
+	The packed buffers are joined and read with a single np.frombuffer, so the JSON
+	embeddings are never decoded. Rows stored before embedding_f32 existed are
+	rebuilt from (and normalized from) the JSON embedding.
+	"""
+	legacy = [idx for idx, (_, packed) in enumerate(rows) if packed is None]
+	if not legacy:
+		return unpack_embedding(b"".join(packed for _, packed in rows)).reshape(len(rows), EMBEDDING_DIM)
+
+	matrix = np.empty((len(rows), EMBEDDING_DIM), dtype=np.float32)
+	for idx, (_, packed) in enumerate(rows):
+		if packed is not None:
+			matrix[idx] = unpack_embedding(packed)
+	legacy_embeddings = dict(
+		ResumeEmbedding.objects.filter(resume_id__in=[rows[idx][0] for idx in legacy])
+		.values_list("resume_id", "embedding")
+	)
+	matrix[legacy] = normalize_rows(np.asarray([legacy_embeddings[rows[idx][0]] for idx in legacy], dtype=np.float32))
+	return matrix
+
+
+def resume_gate_matrix_i8(rows):
+	"""
+	Stack (resume_id, embedding_i8, embedding_scale) rows into an (N, 768) int8
+	matrix and (N,) float32 scales. Rows stored before embedding_i8 existed are
+	quantized from their float32 embedding.
+	"""
+	legacy = [idx for idx, (_, packed, _) in enumerate(rows) if packed is None]
+	scales = np.asarray([scale or 0.0 for _, _, scale in rows], dtype=np.float32)
+	if not legacy:
+		return np.frombuffer(b"".join(packed for _, packed, _ in rows), dtype=np.int8).reshape(len(rows), EMBEDDING_DIM), scales
+
+	matrix = np.empty((len(rows), EMBEDDING_DIM), dtype=np.int8)
+	for idx, (_, packed, _) in enumerate(rows):
+		if packed is not None:
+			matrix[idx] = np.frombuffer(packed, dtype=np.int8)
+	legacy_rows = list(
+		ResumeEmbedding.objects.filter(resume_id__in=[rows[idx][0] for idx in legacy])
+		.values_list("resume_id", "embedding_f32")
+	)
+	legacy_q, legacy_scale = quantize_rows(resume_gate_matrix(legacy_rows))
+	position = {resume_id: pos for pos, (resume_id, _) in enumerate(legacy_rows)}
+	order = [position[rows[idx][0]] for idx in legacy]
+	matrix[legacy] = legacy_q[order]
+	scales[legacy] = legacy_scale[order]
+	return matrix, scales
+
+
+def rescore_near_gate(project_embedding, resume_ids, similarities, top_n=0):
+	"""
+	Replace approximate similarities that pass, or nearly pass, the semantic gate
+	(or could rank in the top_n used when nobody passes) with exact float32 cosine
+	similarities, so gate decisions and the semantic scores carried into Phase 2
+	match the float32 scan.
+	"""
+	similarities = np.asarray(similarities, dtype=np.float32).copy()
+	near = semantic_gate_mask(similarities + INT8_RESCORE_MARGIN)
+	if top_n and len(similarities):
+		kth = min(top_n, len(similarities))
+		near |= similarities >= np.partition(similarities, -kth)[-kth] - INT8_RESCORE_MARGIN
+	near = np.flatnonzero(near)
+	if len(near):
+		rows = list(
+			ResumeEmbedding.objects.filter(resume_id__in=[resume_ids[idx] for idx in near])
+			.values_list("resume_id", "embedding_f32")
+		)
+		exact = dict(zip(
+			(resume_id for resume_id, _ in rows),
+			batch_semantic_similarity(project_embedding, resume_gate_matrix(rows)).tolist()
+		))
+		similarities[near] = [exact[resume_ids[idx]] for idx in near]
+	return similarities
+
+
+def _embedding_state():
+	"""Row count and newest updated_at of embedded resumes; changes whenever the index must."""
+	state = ResumeEmbedding.objects.with_embedding().aggregate(count=Count("id"), latest=Max("updated_at"))
+	return {"count": state["count"], "latest": state["latest"].isoformat() if state["latest"] else None}
+
+
+def _resume_rows(queryset):
+	"""Yield (resume_ids, unit-length float32 matrix) chunks for the given ResumeEmbedding rows."""
+	rows = []
+	for row in queryset.values_list("resume_id", "embedding_f32").iterator(chunk_size=INDEX_BUILD_CHUNK):
+		rows.append(row)
+		if len(rows) == INDEX_BUILD_CHUNK:
+			yield np.asarray([resume_id for resume_id, _ in rows], dtype=np.int64), resume_gate_matrix(rows)
+			rows = []
+	if rows:
+		yield np.asarray([resume_id for resume_id, _ in rows], dtype=np.int64), resume_gate_matrix(rows)
+
+
+def _add_rows(index, queryset):
+	for resume_ids, matrix in _resume_rows(queryset):
+		index.add_with_ids(np.ascontiguousarray(matrix, dtype=np.float32), resume_ids)
+
+
+def _build_index():
+	import faiss
+	from external.index import HNSW_EF_CONSTRUCTION, HNSW_EF_SEARCH, HNSW_M
+
+	hnsw = faiss.IndexHNSWFlat(EMBEDDING_DIM, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+	hnsw.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+	hnsw.hnsw.efSearch = HNSW_EF_SEARCH
+	index = faiss.IndexIDMap2(hnsw)
+	_add_rows(index, ResumeEmbedding.objects.with_embedding())
+	return index
+
+
+def _extend_index(index, index_state, state):
+	"""
+	Add resumes embedded since index_state in place. Rows whose updated_at moved but
+	whose embedding did not (e.g. a re-upload marked pending) are skipped. Returns
+	False when that is not enough (a row was re-embedded or deleted) and the index
+	must be rebuilt.
+	"""
+	import faiss
+
+	if index_state["latest"] is None:
+		return False
+	changed = ResumeEmbedding.objects.with_embedding().filter(updated_at__gt=index_state["latest"])
+	indexed_ids = set(faiss.vector_to_array(index.id_map).tolist())
+	new_ids = []
+	for resume_ids, matrix in _resume_rows(changed):
+		for resume_id, vector in zip(resume_ids.tolist(), matrix):
+			if resume_id not in indexed_ids:
+				new_ids.append(resume_id)
+			elif not np.allclose(index.reconstruct(resume_id), vector, atol=1e-6):
+				return False
+	if index_state["count"] + len(new_ids) != state["count"]:
+		return False
+	_add_rows(index, changed.filter(resume_id__in=new_ids))
+	return True
+
+
+def _load_saved_index():
+	import faiss
+	from external.index import HNSW_EF_SEARCH
+
+	try:
+		with open(RESUME_INDEX_STATE_FILE, "rb") as f:
+			index_state = orjson.loads(f.read())
+		index = faiss.read_index(str(RESUME_INDEX_FILE))
+	except (OSError, orjson.JSONDecodeError, RuntimeError):
+		return None, None
+	faiss.downcast_index(index.index).hnsw.efSearch = HNSW_EF_SEARCH
+	return index, index_state
+
+
+def _save_index(index, index_state):
+	"""Persist the index for other processes; best effort, as this process keeps it in memory."""
+	import faiss
+
+	try:
+		os.makedirs(settings.MATCH_FAISS_INDEX_DIR, exist_ok=True)
+		# Write then rename so other processes never read a half-written file
+		faiss.write_index(index, f"{RESUME_INDEX_FILE}.tmp")
+		os.replace(f"{RESUME_INDEX_FILE}.tmp", RESUME_INDEX_FILE)
+		with open(f"{RESUME_INDEX_STATE_FILE}.tmp", "wb") as f:
+			f.write(orjson.dumps(index_state))
+		os.replace(f"{RESUME_INDEX_STATE_FILE}.tmp", RESUME_INDEX_STATE_FILE)
+	except (OSError, RuntimeError) as e:
+		logger.warning(f"[matching] Could not save FAISS index to {settings.MATCH_FAISS_INDEX_DIR}: {e}")
+
+
+def _rebuild_index():
+	"""Build a fresh index off the request path and swap it in; requests keep the stale one meanwhile."""
+	global _index, _index_state
+	close_old_connections()
+	try:
+		state = _embedding_state()
+		index = _build_index()
+		with _index_lock:
+			_index, _index_state = index, state
+			_save_index(_index, _index_state)
+		logger.info(f"[matching] Rebuilt FAISS index over {index.ntotal} resumes")
+	except Exception:
+		logger.exception("[matching] FAISS index rebuild failed")
+	finally:
+		close_old_connections()
+
+
+def _start_rebuild():
+	global _rebuild_thread
+	if _rebuild_thread is None or not _rebuild_thread.is_alive():
+		_rebuild_thread = threading.Thread(target=_rebuild_index, name="resume-index-rebuild", daemon=True)
+		_rebuild_thread.start()
+
+
+def get_resume_index():
+	"""
+	Process-wide FAISS HNSW index over unit-length resume embeddings, with resume_id
+	as the FAISS id. Checked against ResumeEmbedding on every call (one aggregate
+	query): newly embedded resumes are added in place, and the index is loaded from
+	disk when another process already brought it up to date. Re-embedded or deleted
+	resumes start a rebuild in a background thread; until it finishes the stale
+	index is returned. The check runs at most every INDEX_CHECK_INTERVAL seconds;
+	in between the current index is returned as is.
+
+	Returns:
+		faiss.Index, or None while the first index of this process is being built
+	"""
+	global _index, _index_state, _index_checked_at
+	if _index is not None and _index_checked_at is not None and time.monotonic() - _index_checked_at < INDEX_CHECK_INTERVAL:
+		return _index
+	with _index_lock:
+		_index_checked_at = time.monotonic()
+		state = _embedding_state()
+		if _index_state == state:
+			return _index
+		if _rebuild_thread is not None and _rebuild_thread.is_alive():
+			return _index
+		saved_index, saved_state = _load_saved_index()
+		if saved_state == state or _index is None:
+			_index, _index_state = saved_index, saved_state
+			if _index_state == state:
+				return _index
+		if _index is not None and _extend_index(_index, _index_state, state):
+			_index_state = state
+			_save_index(_index, _index_state)
+			logger.info(f"[matching] Added resumes to FAISS index ({state['count']} indexed)")
+		else:
+			logger.info("[matching] FAISS index out of date; rebuilding in the background")
+			_start_rebuild()
+		return _index
+
+
+def search_resume_index(project_embedding, k):
+	"""
+	Approximate k nearest resumes to a project embedding by cosine similarity.
+
+	Returns:
+		Tuple[resume_ids, similarities]: best first, or None when no index is built yet
+	"""
+	from external.index import search_user_index
+
+	index = get_resume_index()
+	if index is None:
+		return None
+	similarities, resume_ids = search_user_index(index, project_embedding, k)
+	return resume_ids.tolist(), similarities.astype(np.float32)
+
+
+def search_resume_vectors(project_embedding, k):
+	"""
+	k nearest resumes to a project embedding by cosine similarity, from the pgvector
+	HNSW index on resume_vectors.ResumeVector (installed with MATCH_USE_PGVECTOR).
+	Only distances come back, so no embedding is transferred.
+
+	Returns:
+		Tuple[resume_ids, similarities]: best first
+	"""
+	from pgvector import HalfVector
+	from pgvector.django import CosineDistance
+	from resume_vectors.models import ResumeVector
+
+	# An HNSW scan returns at most hnsw.ef_search rows (default 40); raise it to k
+	# for this query only
+	with transaction.atomic():
+		with connection.cursor() as cursor:
+			cursor.execute(f"SET LOCAL hnsw.ef_search = {int(k)}")
+		nearest = list(
+			ResumeVector.objects
+			.annotate(distance=CosineDistance("embedding_vec", HalfVector(project_embedding)))
+			.order_by("distance")
+			.values_list("resume_id", "distance")[:k]
+		)
+	resume_ids = [resume_id for resume_id, _ in nearest]
+	return resume_ids, 1.0 - np.asarray([distance for _, distance in nearest], dtype=np.float32)
+
+
+def _cupy():
+	"""The cupy module when it is installed and a CUDA device is visible, else None (probed once)."""
+	global _cupy_module
+	if _cupy_module is False:
+		try:
+			import cupy
+			_cupy_module = cupy if cupy.cuda.runtime.getDeviceCount() > 0 else None
+		except Exception:  # ImportError, or CUDA runtime/driver errors
+			_cupy_module = None
+		if _cupy_module is not None:
+			logger.info("[matching] CUDA device found; Phase 1 runs on the GPU")
+	return _cupy_module
+
+
+def gpu_semantic_scores(project_embedding):
+	"""
+	Cosine similarity of the project against every embedded resume on the GPU.
+
+	The unit-length resume matrix stays resident on the device between requests
+	and is reloaded only when ResumeEmbedding changes (one aggregate query per
+	call), so a warm request transfers just the project vector and the scores.
+
+	Returns:
+		Tuple[resume_ids, similarities], or None without CuPy or a CUDA device
+	"""
+	global _gpu_matrix
+	cp = _cupy()
+	if cp is None:
+		return None
+	with _gpu_lock:
+		state = _embedding_state()
+		if _gpu_matrix is None or _gpu_matrix[0] != state:
+			resume_ids, chunks = [], []
+			for chunk_ids, matrix in _resume_rows(ResumeEmbedding.objects.with_embedding()):
+				resume_ids.extend(chunk_ids.tolist())
+				chunks.append(matrix)
+			device_matrix = cp.asarray(np.concatenate(chunks)) if chunks else cp.empty((0, EMBEDDING_DIM), dtype=cp.float32)
+			_gpu_matrix = (state, resume_ids, device_matrix)
+		_, resume_ids, device_matrix = _gpu_matrix
+	query = np.asarray(project_embedding, dtype=np.float32)
+	norm = np.sqrt(np.vdot(query, query))
+	if norm:
+		query = query / norm
+	return resume_ids, cp.asnumpy(device_matrix @ cp.asarray(query))
@@ -1,20 +1,60 @@
+import logging
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models.fields.json import KeyTransform
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
+from converge.match_cache import cache_match, get_cached_match, invalidate_project_matches, match_cache_key
 from .models import ProjectEmbedding, ProjectJSON
-from .serializers import ProjectEmbeddingInputSerializer, ProjectEmbeddingSerializer, ProjectJSONSerializer
+from .services import (
+	gpu_semantic_scores,
+	rescore_near_gate,
+	resume_gate_matrix,
+	resume_gate_matrix_i8,
+	search_resume_index,
+	search_resume_vectors,
+)
+from .serializers import MatchQuerySerializer, ProjectEmbeddingInputSerializer, ProjectEmbeddingSerializer, ProjectJSONSerializer
 from resumes.models import ResumeEmbedding, ResumeJSON
 from external.semantic_project import build_semantic_text_project
 from external.embed_project import embed_semantic_text_project
+from external.embedding_store import EMBEDDING_DIM, normalize_rows, pack_embedding, unpack_embedding
 from external.match_users_to_projects import (
-	semantic_relevance_filter,
+	batch_semantic_similarity,
+	quantized_semantic_similarity,
+	semantic_gate_mask,
+	top_k_indices,
+	interpret_similarity,
 	compute_capability_score,
 	compute_trust_score,
 	compute_final_score,
 	PROJECT_TYPE_ALPHA
 )
-from ratings.services import get_global_rating_data
+from ratings.services import get_global_rating_data_bulk
+
+logger = logging.getLogger(__name__)
+
+# Top-level resume JSON keys read by two-layer scoring; extracted in SQL so the
+# rest of each (potentially large) resume document never leaves the database
+RESUME_JSON_SCORING_KEYS = ("profile", "skills", "experience_level", "reputation_signals", "_skills_norm")
+
+# Project JSON keys matching reads, copied onto ProjectEmbedding when the project is
+# embedded so the match hot path never loads the full ProjectJSON document
+PROJECT_MATCH_FIELDS = ("project_type", "title", "description", "required_skills", "preferred_technologies", "domains")
 
+# Nearest resumes fetched from the resume_vector_hnsw index when MATCH_USE_PGVECTOR is on;
+# the semantic gate is then applied to this candidate pool only
+PGVECTOR_CANDIDATES = 500
+
+# Nearest resumes fetched from the FAISS index when MATCH_USE_FAISS is on
+FAISS_CANDIDATES = 500
+
+# Phase 2 scores at most max(top * CANDIDATE_POOL_FACTOR, MIN_CANDIDATE_POOL) gate
+# passers, best semantic scores first; override per request with ?pool=
+CANDIDATE_POOL_FACTOR = 3
+MIN_CANDIDATE_POOL = 50
 
 @api_view(['POST'])
 def generate_project_embedding(request):
@@ -44,26 +84,32 @@ def generate_project_embedding(request):
 	parsed_json = input_serializer.validated_data['parsed_json']
 	
 	try:
-		# Store project JSON for later matching (avoid requiring it in match request)
-		project_json_record, _ = ProjectJSON.objects.update_or_create(
-			project_id=project_id,
-			defaults={"project_json": parsed_json}
-		)
-
 		# Generate semantic text
 		semantic_text = build_semantic_text_project(parsed_json)
 		
-		# Generate embedding
-		embedding = embed_semantic_text_project(semantic_text)
+		# Generate embedding (stored at unit length, like resume embeddings)
+		embedding = normalize_rows(embed_semantic_text_project(semantic_text)[None, :])[0]
 		
-		# Store or update
-		project_embedding, created = ProjectEmbedding.objects.update_or_create(
-			project_id=project_id,
-			defaults={
-				'semantic_text': semantic_text,
-				'embedding': embedding
-			}
-		)
+		# Store the project JSON (for later matching, so the match request need not
+		# carry it) and the embedding together in one short transaction; the Gemini
+		# call above stays outside it, and a failed embed stores nothing
+		with transaction.atomic():
+			project_json_record, _ = ProjectJSON.objects.update_or_create(
+				project_id=project_id,
+				defaults={"project_json": parsed_json}
+			)
+			project_embedding, created = ProjectEmbedding.objects.update_or_create(
+				project_id=project_id,
+				defaults={
+					'semantic_text': semantic_text,
+					'embedding': embedding.tolist(),
+					'embedding_f32': pack_embedding(embedding),
+					'normalized': True,
+					'denormalized': True,
+					**{field: parsed_json.get(field) for field in PROJECT_MATCH_FIELDS}
+				}
+			)
+			invalidate_project_matches(project_id)
 		
 		output_serializer = ProjectEmbeddingSerializer(project_embedding)
 		project_json_serializer = ProjectJSONSerializer(project_json_record)
@@ -83,12 +129,84 @@ def generate_project_embedding(request):
 		)
 
 
+def _score_candidate(candidate, user_json, rating_data, proj_emb, project_type, required_skills):
+	"""
+	Phase 2 two-layer score for one resume that passed the semantic gate.
+
+	Pure function of its arguments (no database access), so match_project can score
+	candidates in any order. rating_data is the candidate's entry from
+	get_global_rating_data_bulk, or None to fall back to the resume's own reputation.
+
+	Returns:
+		dict: One entry of the match response
+	"""
+	# Extract data
+	profile = user_json.get("profile", {})
+	skills = user_json.get("skills", {})
+	experience = user_json.get("experience_level", {})
+	reputation = user_json.get("reputation_signals", {})
+	
+	# Layer 1: Capability and Alignment
+	capability_data = compute_capability_score(
+		proj_emb,
+		candidate['embedding'],
+		project_type,
+		required_skills,
+		skills,
+		experience.get("overall", "beginner"),
+		semantic_score=candidate['semantic_score'],
+		user_skills_norm=user_json.get("_skills_norm")
+	)
+	
+	# Layer 2: Trust and Execution
+	# Use bulk-fetched ratings and fall back to neutral defaults if unavailable
+	global_rating_data = rating_data or {
+		"global_rating": reputation.get("average_rating", 3.5),
+		"ratings_count": 0,
+	}
+	global_rating = global_rating_data.get("global_rating", reputation.get("average_rating", 3.5))
+	completed_projects = reputation.get("completed_projects", 0)
+	dropped_projects = 0  # TODO: from project history
+	availability = profile.get("availability", "medium")
+	
+	trust_data = compute_trust_score(
+		global_rating,
+		completed_projects,
+		dropped_projects,
+		availability
+	)
+	
+	# Final score
+	final_score_data = compute_final_score(
+		capability_data["capability_score"],
+		trust_data["trust_score"],
+		project_type
+	)
+	
+	return {
+		"resume_id": candidate['resume_id'],
+		"final_score": final_score_data["final_score"],
+		"layer1_capability": capability_data,
+		"layer2_trust": trust_data,
+		"scoring_formula": final_score_data,
+		"ratings": global_rating_data,
+		"profile": {
+			"name": profile.get("name", "Unknown"),
+			"year": profile.get("year", "Unknown"),
+			"availability": availability
+		}
+	}
+
+
 @api_view(['POST'])
 def match_project(request, project_id):
 	"""
 	Find top-N matching resumes for a project using two-layer scoring.
 	
-	POST /api/project/match/{project_id}/?top=5
+	POST /api/project/match/{project_id}/?top=5&pool=50
+	
+	Only the `pool` resumes with the best semantic scores among those passing the
+	gate are scored in Phase 2 (default max(3 * top, 50)); the best `top` are returned.
 	
 	Returns: {
 		"project_id": 456,
@@ -118,100 +236,155 @@ def match_project(request, project_id):
 		"count": 5
 	}
 	"""
-	try:
-		top_n = int(request.query_params.get('top', 5))
-	except ValueError:
-		top_n = 5
+	query_serializer = MatchQuerySerializer(data=request.query_params)
+	if not query_serializer.is_valid():
+		return Response(query_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+	top_n = query_serializer.validated_data['top']
+	candidate_pool = query_serializer.validated_data.get('pool') or max(top_n * CANDIDATE_POOL_FACTOR, MIN_CANDIDATE_POOL)
 	
 	try:
-		# Get project embedding
-		project_embedding_obj = ProjectEmbedding.objects.get(project_id=project_id)
-		proj_emb = project_embedding_obj.embedding
-		
-		if not proj_emb:
-			return Response(
-				{"error": f"Project {project_id} has no embedding"},
-				status=status.HTTP_400_BAD_REQUEST
+		# Get the packed project embedding and the project fields matching reads in one query
+		packed_emb, denormalized, *match_fields = (
+			ProjectEmbedding.objects.filter(project_id=project_id)
+			.values_list("embedding_f32", "denormalized", *PROJECT_MATCH_FIELDS)
+			.get()
+		)
+		if denormalized:
+			stored_project_json = {
+				field: value for field, value in zip(PROJECT_MATCH_FIELDS, match_fields) if value is not None
+			}
+		else:
+			# Rows embedded before the match fields were copied read the stored JSON
+			stored_project_json = (
+				ProjectJSON.objects.filter(project_id=project_id).values_list("project_json", flat=True).first()
 			)
+		if packed_emb:
+			proj_emb = unpack_embedding(packed_emb)
+		else:
+			# Rows stored before embedding_f32 existed only have the JSON embedding
+			proj_emb = ProjectEmbedding.objects.values_list("embedding", flat=True).get(project_id=project_id)
+			if not proj_emb:
+				return Response(
+					{"error": f"Project {project_id} has no embedding"},
+					status=status.HTTP_400_BAD_REQUEST
+				)
 		
-		# Load stored project JSON; allow request body override if provided
-		stored_project_json = None
-		try:
-			stored_project_json = ProjectJSON.objects.get(project_id=project_id).project_json
-		except ProjectJSON.DoesNotExist:
-			stored_project_json = None
-		proj_json = request.data.get('project_json') or stored_project_json or {}
+		# Allow request body override of the stored project JSON if provided
+		override_json = request.data.get('project_json')
+		proj_json = override_json or stored_project_json or {}
 
 		if not proj_json:
 			return Response(
 				{"error": "project JSON not found; provide project_json or store it first"},
 				status=status.HTTP_400_BAD_REQUEST
 			)
+
+		# Repeat requests are served from cache until a resume, rating or this
+		# project changes; ad-hoc project_json or resume_jsons payloads are never cached
+		cache_key = None
+		if not override_json and not request.data.get('resume_jsons'):
+			cache_key = match_cache_key(project_id, np.asarray(proj_emb, dtype=np.float32), top_n, candidate_pool)
+			cached = get_cached_match(cache_key) if cache_key is not None else None
+			if cached is not None:
+				return Response(cached, status=status.HTTP_200_OK)
 		
 		project_type = proj_json.get("project_type", "hackathon")
 		required_skills = proj_json.get("required_skills", [])
 		
 		results = []
-		total_resumes = ResumeEmbedding.objects.count()
-		resumes_with_embeddings = 0
-		passed_gate = 0
 		
-		print(f"\n{'='*60}")
-		print(f"[matching] Two-layer matching for project_id={project_id}")
-		print(f"[matching] Project type: {project_type}, Skills: {required_skills}")
-		print(f"{'='*60}")
+		logger.info(f"[matching] Two-layer matching for project_id={project_id} (type={project_type}, skills={required_skills})")
+		debug = logger.isEnabledFor(logging.DEBUG)
+		debug_rows = []  # per-resume trace, emitted as one record per phase
 		
 		# Phase 1: Semantic relevance filter
-		phase1_passes = []
-		semantic_candidates = []  # keep all with their scores for fallback if gate is too strict
-		
-		for idx, resume_emb in enumerate(ResumeEmbedding.objects.all(), 1):
-			if not resume_emb.embedding:
-				print(f"[{idx}/{total_resumes}] resume_id={resume_emb.resume_id}: ❌ No embedding")
-				continue
-			
-			resumes_with_embeddings += 1
-			
-			# Apply semantic filter
-			passes, sem_score, interpretation = semantic_relevance_filter(
-				proj_emb, 
-				resume_emb.embedding
+		# Stream just the columns the gate needs for resumes that have an embedding
+		# (served by the resume_with_embedding_idx partial index), then score every
+		# resume against the project with a single matmul
+		resume_matrix = None
+		ann_candidates = None  # size of the ANN shortlist; None when every resume was scanned
+		if settings.MATCH_USE_PGVECTOR:
+			# Approximate nearest neighbours straight from Postgres (half-precision HNSW,
+			# cosine distance, see projects/services.py); only the top
+			# PGVECTOR_CANDIDATES reach the gate
+			resume_ids, sem_scores = search_resume_vectors(proj_emb, PGVECTOR_CANDIDATES)
+			ann_candidates = len(resume_ids)
+		elif settings.MATCH_USE_FAISS and (faiss_hits := search_resume_index(proj_emb, FAISS_CANDIDATES)) is not None:
+			# Approximate nearest neighbours from the in-process FAISS HNSW index
+			# (projects/services.py); only the top FAISS_CANDIDATES reach the gate.
+			# Until the first index is built the exact scans below are used
+			resume_ids, sem_scores = faiss_hits
+			ann_candidates = len(resume_ids)
+		elif settings.MATCH_GATE_INT8:
+			# Scan the int8 copies (a quarter of the bytes per resume), then rescore
+			# resumes at or near the gate from their float32 embedding
+			quantized_rows = list(
+				ResumeEmbedding.objects.with_embedding()
+				.values_list("resume_id", "embedding_i8", "embedding_scale")
+				.iterator(chunk_size=2000)
+			)
+			resume_ids = [resume_id for resume_id, _, _ in quantized_rows]
+			if quantized_rows:
+				resume_q, resume_scale = resume_gate_matrix_i8(quantized_rows)
+				sem_scores = rescore_near_gate(
+					proj_emb, resume_ids, quantized_semantic_similarity(proj_emb, resume_q, resume_scale), top_n
+				)
+			else:
+				sem_scores = np.empty(0, dtype=np.float32)
+		elif settings.MATCH_USE_GPU and (gpu_scores := gpu_semantic_scores(proj_emb)) is not None:
+			# Resume matrix resident on a CUDA device (CuPy); the scan is one GPU matmul
+			resume_ids, sem_scores = gpu_scores
+		else:
+			packed_rows = list(
+				ResumeEmbedding.objects.with_embedding()
+				.values_list("resume_id", "embedding_f32")
+				.iterator(chunk_size=2000)
 			)
-			
-			print(f"[{idx}/{total_resumes}] resume_id={resume_emb.resume_id}: semantic={sem_score:.4f} ({interpretation}), passes={passes}")
-			semantic_candidates.append({
-				"resume_id": resume_emb.resume_id,
-				"embedding": resume_emb.embedding,
-				"semantic_score": sem_score,
-				"interpretation": interpretation,
-				"passed": passes,
-			})
-			
-			if not passes:
-				continue
-			
-			passed_gate += 1
-			phase1_passes.append({
-				'resume_id': resume_emb.resume_id,
-				'embedding': resume_emb.embedding,
-				'semantic_score': sem_score
-			})
+			resume_ids = [resume_id for resume_id, _ in packed_rows]
+			if packed_rows:
+				resume_matrix = resume_gate_matrix(packed_rows)
+				sem_scores = batch_semantic_similarity(proj_emb, resume_matrix)
+			else:
+				sem_scores = np.empty(0, dtype=np.float32)
+		if ann_candidates is None:
+			# Stats come from the scan itself rather than a separate COUNT(*) per request
+			resumes_with_embeddings = len(resume_ids)
+			total_resumes = resumes_with_embeddings
+		else:
+			# The ANN paths only see their shortlist, so count the table (index-only counts)
+			resumes_with_embeddings = ResumeEmbedding.objects.with_embedding().count()
+			total_resumes = ResumeEmbedding.objects.count()
+		
+		pass_mask = semantic_gate_mask(sem_scores)
+		if debug:
+			for idx, (resume_id, sem_score, passes) in enumerate(zip(resume_ids, sem_scores, pass_mask), 1):
+				interpretation = interpret_similarity(float(sem_score))[1]
+				debug_rows.append(f"[{idx}/{len(resume_ids)}] resume_id={resume_id}: semantic={sem_score:.4f} ({interpretation}), passes={passes}")
+			logger.debug("\n".join(debug_rows))
+			debug_rows = []
 		
-		print(f"[matching] Phase 1: {passed_gate}/{resumes_with_embeddings} passed semantic filter")
+		passed_gate = int(pass_mask.sum())
+		passed_idx = np.flatnonzero(pass_mask)
+		if len(passed_idx) > candidate_pool:
+			# Phase 2 scores only the candidate_pool best gate passers (kept in scan order)
+			passed_idx = np.sort(passed_idx[top_k_indices(sem_scores[passed_idx], candidate_pool)])
+		
+		logger.info(f"[matching] Phase 1: {passed_gate}/{len(resume_ids)} passed semantic filter")
 
 		# Fallback: if no one passed the semantic gate, take the top-N by semantic score to continue scoring
-		if not phase1_passes and semantic_candidates:
-			semantic_candidates.sort(key=lambda c: c["semantic_score"], reverse=True)
-			top_semantic = semantic_candidates[:top_n]
-			phase1_passes = [
-				{
-					"resume_id": c["resume_id"],
-					"embedding": c["embedding"],
-					"semantic_score": c["semantic_score"],
-				}
-				for c in top_semantic
-			]
-			print(f"[matching] Fallback: semantic gate strict; proceeding with top {len(phase1_passes)} by semantic score")
+		if not len(passed_idx) and resume_ids:
+			passed_idx = top_k_indices(sem_scores, top_n)
+			logger.info(f"[matching] Fallback: semantic gate strict; proceeding with top {len(passed_idx)} by semantic score")
+		
+		# Scores stay in the scan arrays; dicts are built only for the resumes Phase 2 scores
+		phase1_passes = [
+			{
+				'resume_id': resume_ids[idx],
+				'embedding': resume_matrix[idx] if resume_matrix is not None else None,
+				'semantic_score': float(sem_scores[idx])
+			}
+			for idx in passed_idx
+		]
 		
 		#we have two phases to compute scores
 		#first one is based on the embeddings, gives semantic score
@@ -221,100 +394,64 @@ def match_project(request, project_id):
 		
 		# Phase 2: Two-layer scoring
 		# Fetch stored resume JSONs for candidates we will score
-		resume_ids = [candidate['resume_id'] for candidate in phase1_passes]
+		candidate_ids = [candidate['resume_id'] for candidate in phase1_passes]
+		resume_rows = ResumeJSON.objects.filter(resume_id__in=candidate_ids).values_list(
+			"resume_id",
+			*(KeyTransform(key, "resume_json") for key in RESUME_JSON_SCORING_KEYS)
+		)
 		stored_resume_jsons = {
-			record.resume_id: record.resume_json or {}
-			for record in ResumeJSON.objects.filter(resume_id__in=resume_ids)
+			row[0]: {key: value for key, value in zip(RESUME_JSON_SCORING_KEYS, row[1:]) if value is not None}
+			for row in resume_rows
 		}
 		# Fallback to request payload if provided (for backward compatibility/tests)
 		fallback_resume_jsons = request.data.get('resume_jsons', {})
+		# Ratings for every candidate in one grouped query; on failure each candidate
+		# falls back to the neutral default from its resume below
+		try:
+			ratings_by_resume = get_global_rating_data_bulk(int(resume_id) for resume_id in candidate_ids)
+		except Exception:
+			logger.warning("[matching] Ratings lookup failed; using resume defaults", exc_info=True)
+			ratings_by_resume = {}
 
 		#phase1_passes contains resumes that passed the semantic filter
 
 		for candidate in phase1_passes:
 			resume_id = candidate['resume_id']
-			
 			# Get resume JSON from local store, fallback to provided body
 			user_json = stored_resume_jsons.get(resume_id) or fallback_resume_jsons.get(str(resume_id), {}) or {}
-			
-			# Extract data
-			profile = user_json.get("profile", {})
-			skills = user_json.get("skills", {})
-			experience = user_json.get("experience_level", {})
-			reputation = user_json.get("reputation_signals", {})
-			
-			# Layer 1: Capability and Alignment
-			capability_data = compute_capability_score(
+			result = _score_candidate(
+				candidate,
+				user_json,
+				ratings_by_resume.get(int(resume_id)),
 				proj_emb,
-				candidate['embedding'],
 				project_type,
-				required_skills,
-				skills,
-				experience.get("overall", "beginner")
+				required_skills
 			)
-			
-			# Layer 2: Trust and Execution
-			# Fetch ratings and fall back to neutral defaults if unavailable
-			global_rating_data = {
-				"global_rating": reputation.get("average_rating", 3.5),
-				"ratings_count": 0,
-			}
-			try:
-				global_rating_data = get_global_rating_data(int(resume_id))
-			except Exception:
-				# If ratings service unavailable, use defaults above
-				pass
-			global_rating = global_rating_data.get("global_rating", reputation.get("average_rating", 3.5))
-			completed_projects = reputation.get("completed_projects", 0)
-			dropped_projects = 0  # TODO: from project history
-			availability = profile.get("availability", "medium")
-			
-			trust_data = compute_trust_score(
-				global_rating,
-				completed_projects,
-				dropped_projects,
-				availability
-			)
-			
-			# Final score
-			final_score_data = compute_final_score(
-				capability_data["capability_score"],
-				trust_data["trust_score"],
-				project_type
-			)
-			
-			print(f"    └─ resume_id={resume_id}: Final={final_score_data['final_score']:.4f} (C={capability_data['capability_score']:.4f}, T={trust_data['trust_score']:.4f})")
-			
-			results.append({
-				"resume_id": resume_id,
-				"final_score": final_score_data["final_score"],
-				"layer1_capability": capability_data,
-				"layer2_trust": trust_data,
-				"scoring_formula": final_score_data,
-				"ratings": global_rating_data,
-				"profile": {
-					"name": profile.get("name", "Unknown"),
-					"year": profile.get("year", "Unknown"),
-					"availability": availability
-				}
-			})
+			if debug:
+				debug_rows.append(
+					f"    └─ resume_id={resume_id}: Final={result['final_score']:.4f} "
+					f"(C={result['layer1_capability']['capability_score']:.4f}, T={result['layer2_trust']['trust_score']:.4f})"
+				)
+			results.append(result)
 		
-		# Sort by final score
+		# Sort by final score and keep the requested number
 		results.sort(key=lambda r: r["final_score"], reverse=True)
+		scored = len(results)
+		results = results[:top_n]
 		
-		print(f"\n{'='*60}")
-		print(f"[matching] Summary:")
-		print(f"  Total resumes: {total_resumes}")
-		print(f"  With embeddings: {resumes_with_embeddings}")
-		print(f"  Passed semantic gate: {passed_gate}")
-		print(f"  Final matches: {len(results)}")
-		print(f"{'='*60}\n")
+		if debug:
+			logger.debug("\n".join(debug_rows))
+		logger.info(
+			f"[matching] Summary for project_id={project_id}: total resumes={total_resumes}, "
+			f"with embeddings={resumes_with_embeddings}, passed semantic gate={passed_gate}, "
+			f"final matches={len(results)}"
+		)
 		
-		return Response({
+		payload = {
 			"project_id": project_id,
 			"project_type": project_type,
 			"alpha": PROJECT_TYPE_ALPHA.get(project_type, 0.65),
-			"matches": results,  # Return all matches, not limited to top_n
+			"matches": results,
 			"count": len(results),
 			"top_n_requested": top_n,  # Include what was requested
 			"project_metadata": {
@@ -328,9 +465,15 @@ def match_project(request, project_id):
 			"stats": {
 				"total_resumes": total_resumes,
 				"with_embeddings": resumes_with_embeddings,
-				"passed_filter": passed_gate
+				"passed_filter": passed_gate,
+				"scored": scored
 			}
-		}, status=status.HTTP_200_OK)
+		}
+		if ann_candidates is not None:
+			payload["stats"]["ann_candidates"] = ann_candidates
+		if cache_key is not None:
+			cache_match(cache_key, payload)
+		return Response(payload, status=status.HTTP_200_OK)
 		
 	except ProjectEmbedding.DoesNotExist:
 		return Response(
@@ -338,8 +481,7 @@ def match_project(request, project_id):
 			status=status.HTTP_404_NOT_FOUND
 		)
 	except Exception as e:
-		import traceback
-		print(traceback.format_exc())
+		logger.exception(f"[matching] Matching failed for project_id={project_id}")
 		return Response(
 			{"error": f"Matching failed: {str(e)}"},
 			status=status.HTTP_500_INTERNAL_SERVER_ERROR
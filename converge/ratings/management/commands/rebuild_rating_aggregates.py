@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from ratings.services import rebuild_rating_aggregates
+
+
+class Command(BaseCommand):
+	help = (
+		"Recompute the per-ratee rating totals (UserRatingAgg) from the ratings table. "
+		"Run after ratings are edited or deleted outside the submit API."
+	)
+
+	def handle(self, *args, **options):
+		count = rebuild_rating_aggregates()
+		self.stdout.write(f"Rebuilt rating aggregates for {count} ratee(s)")
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.7 on 2026-10-15 07:02
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_aggregates(apps, schema_editor):
+    # Seed the running totals from ratings submitted before the table existed
+    Rating = apps.get_model('ratings', 'Rating')
+    UserRatingAgg = apps.get_model('ratings', 'UserRatingAgg')
+    rows = (
+        Rating.objects.values('ratee_id')
+        .annotate(count=Count('id'), total=Sum('adjusted_rating'))
+        .order_by()
+    )
+    UserRatingAgg.objects.bulk_create(
+        [UserRatingAgg(ratee_id=row['ratee_id'], sum_adjusted=row['total'] or 0.0, count=row['count']) for row in rows],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ratings', '0002_alter_rating_ratee_id_alter_rating_rater_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserRatingAgg',
+            fields=[
+                ('ratee_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('sum_adjusted', models.FloatField(default=0.0)),
+                ('count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'user_rating_agg',
+            },
+        ),
+        migrations.RunPython(backfill_aggregates, migrations.RunPython.noop),
+    ]
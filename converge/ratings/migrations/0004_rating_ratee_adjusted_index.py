@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-15 07:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ratings', '0003_user_rating_agg'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rating',
+            index=models.Index(fields=['ratee_id', 'adjusted_rating'], name='idx_ratee_adj'),
+        ),
+        migrations.RemoveIndex(
+            model_name='rating',
+            name='ratings_ratee_i_f53feb_idx',
+        ),
+    ]
@@ -14,10 +14,28 @@ class Rating(models.Model):
 	class Meta:
 		db_table = "ratings"
 		indexes = [
-			models.Index(fields=["ratee_id"]),
+			# Leads with ratee_id and covers adjusted_rating, so per-ratee sums are index-only scans
+			models.Index(fields=["ratee_id", "adjusted_rating"], name="idx_ratee_adj"),
 			models.Index(fields=["rater_id"]),
 			models.Index(fields=["project_id"]),
 		]
 
 	def __str__(self):
 		return f"Rating {self.rater_id} -> {self.ratee_id} ({self.project_id})"
+
+
+class UserRatingAgg(models.Model):
+	"""
+	Running per-ratee totals of adjusted ratings, kept in step by submit_rating_record.
+	After editing or deleting Rating rows, run `manage.py rebuild_rating_aggregates`.
+	"""
+	ratee_id = models.IntegerField(primary_key=True)
+	sum_adjusted = models.FloatField(default=0.0)
+	count = models.IntegerField(default=0)
+	updated_at = models.DateTimeField(auto_now=True)
+
+	class Meta:
+		db_table = "user_rating_agg"
+
+	def __str__(self):
+		return f"UserRatingAgg {self.ratee_id} ({self.count} ratings)"
@@ -1,6 +1,8 @@
-from typing import Dict
-from django.db.models import Avg, Count, Sum
-from .models import Rating
+from typing import Dict, Iterable
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from converge.match_cache import invalidate_all_matches
+from .models import Rating, UserRatingAgg
 
 CATEGORY_WEIGHTS = {
     "technical": 0.30,
@@ -9,36 +11,94 @@ CATEGORY_WEIGHTS = {
     "initiative": 0.15,
     "overall": 0.10,
 }
+# Fixed category order, so the weighted sum does not depend on the client's key order
+_WEIGHTED_CATEGORIES = tuple(CATEGORY_WEIGHTS.items())
 PRIOR_MEAN = 3.5
 PRIOR_WEIGHT = 3
 
 
 def calculate_raw_rating(category_scores: Dict[str, float]) -> float:
     total = 0.0
-    for cat, score in category_scores.items():
-        w = CATEGORY_WEIGHTS.get(cat, 0)
-        total += w * float(score)
+    for cat, w in _WEIGHTED_CATEGORIES:
+        score = category_scores.get(cat)
+        if score is not None:
+            total += w * float(score)
     return round(total, 3)
 
 
 def submit_rating_record(rater_id: int, ratee_id: int, project_id: str, category_scores: Dict[str, float]) -> Rating:
     raw = calculate_raw_rating(category_scores)
     adjusted = raw  # placeholder for rater reliability multiplier
-    return Rating.objects.create(
-        rater_id=rater_id,
+    with transaction.atomic():
+        record = Rating.objects.create(
+            rater_id=rater_id,
+            ratee_id=ratee_id,
+            project_id=project_id,
+            category_scores=category_scores,
+            raw_rating=raw,
+            adjusted_rating=adjusted,
+        )
+        _add_to_aggregate(ratee_id, adjusted)
+        invalidate_all_matches()
+    return record
+
+
+def _add_to_aggregate(ratee_id: int, adjusted: float) -> None:
+    # Increment in SQL so concurrent submits for the same ratee don't lose updates
+    increment = {"sum_adjusted": F("sum_adjusted") + adjusted, "count": F("count") + 1}
+    if UserRatingAgg.objects.filter(ratee_id=ratee_id).update(**increment):
+        return
+    _, created = UserRatingAgg.objects.get_or_create(
         ratee_id=ratee_id,
-        project_id=project_id,
-        category_scores=category_scores,
-        raw_rating=raw,
-        adjusted_rating=adjusted,
+        defaults={"sum_adjusted": adjusted, "count": 1},
     )
+    if not created:
+        # Another request created the row between our update and insert
+        UserRatingAgg.objects.filter(ratee_id=ratee_id).update(**increment)
 
 
-def get_global_rating_data(ratee_id: int) -> Dict:
-    qs = Rating.objects.filter(ratee_id=ratee_id)
-    count = qs.count()
+def rebuild_rating_aggregates() -> int:
+    """
+    Recompute every UserRatingAgg row from the ratings table.
+
+    submit_rating_record only ever adds to the running totals, so ratings edited or
+    deleted elsewhere (e.g. in the admin) leave them stale until this is run.
+    Returns the number of ratees with an aggregate.
+    """
+    rows = (
+        Rating.objects.values("ratee_id")
+        .annotate(count=Count("id"), total=Sum("adjusted_rating"))
+        .order_by()
+    )
+    with transaction.atomic():
+        UserRatingAgg.objects.all().delete()
+        aggregates = UserRatingAgg.objects.bulk_create(
+            [UserRatingAgg(ratee_id=row["ratee_id"], sum_adjusted=row["total"] or 0.0, count=row["count"]) for row in rows],
+            batch_size=1000,
+        )
+        invalidate_all_matches()
+    return len(aggregates)
+
+
+def _smoothed_rating(count: int, total: float) -> Dict:
     if count == 0:
         return {"global_rating": PRIOR_MEAN, "ratings_count": 0}
-    sum_adj = qs.aggregate(total=Sum("adjusted_rating"))['total'] or 0.0
-    global_rating = (PRIOR_MEAN * PRIOR_WEIGHT + sum_adj) / (PRIOR_WEIGHT + count)
+    global_rating = (PRIOR_MEAN * PRIOR_WEIGHT + (total or 0.0)) / (PRIOR_WEIGHT + count)
     return {"global_rating": round(global_rating, 3), "ratings_count": count}
+
+
+def get_global_rating_data(ratee_id: int) -> Dict:
+    agg = UserRatingAgg.objects.filter(ratee_id=ratee_id).values_list("count", "sum_adjusted").first()
+    return _smoothed_rating(*(agg or (0, 0.0)))
+
+
+def get_global_rating_data_bulk(ratee_ids: Iterable[int]) -> Dict[int, Dict]:
+    """get_global_rating_data for many ratees with one primary-key lookup."""
+    ratee_ids = set(ratee_ids)
+    aggregates = {
+        ratee_id: (count, total)
+        for ratee_id, count, total in UserRatingAgg.objects.filter(ratee_id__in=ratee_ids).values_list(
+            "ratee_id", "count", "sum_adjusted"
+        )
+    }
+    return {ratee_id: _smoothed_rating(*aggregates.get(ratee_id, (0, 0.0))) for ratee_id in ratee_ids}
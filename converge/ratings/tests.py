@@ -1,3 +1,92 @@
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
 from django.test import TestCase
+from .models import Rating, UserRatingAgg
+from .services import (
+	PRIOR_MEAN,
+	_add_to_aggregate,
+	get_global_rating_data,
+	get_global_rating_data_bulk,
+	rebuild_rating_aggregates,
+	submit_rating_record,
+)
 
-# Create your tests here.
+
+class AddToAggregateTests(TestCase):
+	def test_first_rating_creates_the_row(self):
+		_add_to_aggregate(7, 4.0)
+
+		agg = UserRatingAgg.objects.get(ratee_id=7)
+		self.assertEqual((agg.count, agg.sum_adjusted), (1, 4.0))
+
+	def test_existing_row_is_incremented(self):
+		UserRatingAgg.objects.create(ratee_id=7, sum_adjusted=4.0, count=1)
+
+		with mock.patch.object(UserRatingAgg.objects, "get_or_create") as get_or_create:
+			_add_to_aggregate(7, 3.0)
+
+		get_or_create.assert_not_called()
+		agg = UserRatingAgg.objects.get(ratee_id=7)
+		self.assertEqual((agg.count, agg.sum_adjusted), (2, 7.0))
+
+	def test_row_created_concurrently_is_incremented(self):
+		# Another request inserts the row after our UPDATE matched nothing
+		real_get_or_create = UserRatingAgg.objects.get_or_create
+
+		def racing_get_or_create(**kwargs):
+			UserRatingAgg.objects.create(ratee_id=7, sum_adjusted=5.0, count=1)
+			return real_get_or_create(**kwargs)
+
+		with mock.patch.object(UserRatingAgg.objects, "get_or_create", side_effect=racing_get_or_create):
+			_add_to_aggregate(7, 3.0)
+
+		agg = UserRatingAgg.objects.get(ratee_id=7)
+		self.assertEqual((agg.count, agg.sum_adjusted), (2, 8.0))
+
+
+class GlobalRatingTests(TestCase):
+	def test_unrated_user_gets_the_prior(self):
+		self.assertEqual(get_global_rating_data(7), {"global_rating": PRIOR_MEAN, "ratings_count": 0})
+
+	def test_submissions_update_the_smoothed_rating(self):
+		scores = {"technical": 5, "reliability": 5, "communication": 5, "initiative": 5, "overall": 5}
+		submit_rating_record(1, 7, "p1", scores)
+		submit_rating_record(2, 7, "p1", scores)
+
+		# (3.5 * 3 + 5 + 5) / (3 + 2)
+		self.assertEqual(get_global_rating_data(7), {"global_rating": 4.1, "ratings_count": 2})
+		self.assertEqual(get_global_rating_data_bulk([7, 8])[7], get_global_rating_data(7))
+		self.assertEqual(get_global_rating_data_bulk([7, 8])[8]["ratings_count"], 0)
+
+
+class RebuildRatingAggregatesTests(TestCase):
+	def _rate(self, ratee_id, adjusted):
+		return Rating.objects.create(
+			rater_id=1, ratee_id=ratee_id, project_id="p1", raw_rating=adjusted, adjusted_rating=adjusted
+		)
+
+	def test_rebuild_reflects_edits_and_deletes(self):
+		kept = self._rate(7, 4.0)
+		deleted = self._rate(7, 2.0)
+		self._rate(8, 3.0)
+		UserRatingAgg.objects.create(ratee_id=7, sum_adjusted=6.0, count=2)
+		UserRatingAgg.objects.create(ratee_id=9, sum_adjusted=1.0, count=1)
+
+		deleted.delete()
+		kept.adjusted_rating = 5.0
+		kept.save()
+
+		self.assertEqual(rebuild_rating_aggregates(), 2)
+		self.assertEqual(
+			set(UserRatingAgg.objects.values_list("ratee_id", "count", "sum_adjusted")),
+			{(7, 1, 5.0), (8, 1, 3.0)},
+		)
+
+	def test_command_reports_the_rebuilt_count(self):
+		self._rate(7, 4.0)
+		out = StringIO()
+
+		call_command("rebuild_rating_aggregates", stdout=out)
+
+		self.assertIn("1 ratee(s)", out.getvalue())
@@ -1,9 +1,12 @@
+import logging
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from .serializers import SubmitRatingSerializer, RatingSerializer
 from .services import submit_rating_record, get_global_rating_data
 
+logger = logging.getLogger(__name__)
+
 
 @api_view(['POST', 'OPTIONS'])
 def submit_rating(request):
@@ -11,25 +14,23 @@ def submit_rating(request):
 	if request.method == 'OPTIONS':
 		return Response(status=status.HTTP_200_OK)
 	try:
-		print(f"[ratings] Raw request data: {request.data}")
+		logger.debug(f"[ratings] Raw request data: {request.data}")
 		serializer = SubmitRatingSerializer(data=request.data)
 		if not serializer.is_valid():
-			print(f"[ratings] Validation errors: {serializer.errors}")
+			logger.info(f"[ratings] Validation errors: {serializer.errors}")
 			return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 		data = serializer.validated_data
-		print(f"[ratings] Validated data: rater={data['rater_id']}, ratee={data['ratee_id']}, project={data['project_id']}")
+		logger.debug(f"[ratings] Validated data: rater={data['rater_id']}, ratee={data['ratee_id']}, project={data['project_id']}")
 		record = submit_rating_record(
 			rater_id=data['rater_id'],
 			ratee_id=data['ratee_id'],
 			project_id=data['project_id'],
 			category_scores=data['category_scores']
 		)
-		print(f"[ratings] Rating stored successfully: {record}")
+		logger.info(f"[ratings] Rating stored successfully: {record}")
 		return Response(RatingSerializer(record).data, status=status.HTTP_201_CREATED)
 	except Exception as e:
-		import traceback
-		print(f"[ratings] Exception: {e}")
-		print(traceback.format_exc())
+		logger.exception(f"[ratings] Exception: {e}")
 		return Response(
 			{"error": str(e)},
 			status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-15 07:30
+
+import numpy as np
+import pgvector.django
+import pgvector.django.halfvec
+import pgvector.django.indexes
+from django.db import migrations, models
+
+
+def backfill_resume_vectors(apps, schema_editor):
+    # Copy every embedded resume (unit length) before the HNSW index is built
+    ResumeEmbedding = apps.get_model('resumes', 'ResumeEmbedding')
+    ResumeVector = apps.get_model('resume_vectors', 'ResumeVector')
+    batch = []
+    rows = ResumeEmbedding.objects.exclude(embedding=[]).values_list('resume_id', 'embedding', 'embedding_f32')
+    for resume_id, embedding, packed in rows.iterator(chunk_size=500):
+        if packed:
+            vector = np.frombuffer(packed, dtype=np.float32)
+        else:
+            vector = np.asarray(embedding, dtype=np.float32)
+            norm = np.linalg.norm(vector)
+            vector = vector / norm if norm else vector
+        batch.append(ResumeVector(resume_id=resume_id, embedding_vec=vector))
+        if len(batch) >= 500:
+            ResumeVector.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        ResumeVector.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('resumes', '0011_drop_embedding_vec'),
+    ]
+
+    operations = [
+        pgvector.django.VectorExtension(),
+        migrations.CreateModel(
+            name='ResumeVector',
+            fields=[
+                ('resume_id', models.IntegerField(help_text='ResumeEmbedding.resume_id', primary_key=True, serialize=False)),
+                ('embedding_vec', pgvector.django.halfvec.HalfVectorField(dimensions=768, help_text='Unit-length resume embedding in half precision')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'resume_vectors',
+            },
+        ),
+        migrations.RunPython(backfill_resume_vectors, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='resumevector',
+            index=pgvector.django.indexes.HnswIndex(ef_construction=64, fields=['embedding_vec'], m=16, name='resume_vector_hnsw', opclasses=['halfvec_cosine_ops']),
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.db import models
+from pgvector.django import HalfVectorField, HnswIndex
+
+
+class ResumeVector(models.Model):
+	"""
+	Half-precision pgvector copy of each resume embedding for in-database cosine search.
+	This app is installed only when MATCH_USE_PGVECTOR is on, so deployments without
+	the vector extension never create the table or pay for HNSW maintenance.
+	"""
+	resume_id = models.IntegerField(primary_key=True, help_text="ResumeEmbedding.resume_id")
+	embedding_vec = HalfVectorField(dimensions=768, help_text="Unit-length resume embedding in half precision")
+	updated_at = models.DateTimeField(auto_now=True)
+
+	class Meta:
+		db_table = "resume_vectors"
+		indexes = [
+			HnswIndex(
+				name='resume_vector_hnsw',
+				fields=['embedding_vec'],
+				m=16,
+				ef_construction=64,
+				opclasses=['halfvec_cosine_ops'],
+			),
+		]
+
+	def __str__(self):
+		return f"ResumeVector(resume_id={self.resume_id})"
@@ -0,0 +1,24 @@
+from concurrent.futures import wait
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from resumes.tasks import STALE_TASK_AFTER, requeue_stale_resumes
+
+
+class Command(BaseCommand):
+	help = (
+		"Re-run background embedding for resumes left pending/processing, e.g. after a "
+		"worker restart or deploy dropped their in-memory jobs. Safe to run from cron."
+	)
+
+	def add_arguments(self, parser):
+		parser.add_argument(
+			"--older-than",
+			type=int,
+			default=int(STALE_TASK_AFTER.total_seconds() // 60),
+			help="Minutes a job may sit pending/processing before it is re-run (0 re-runs all)",
+		)
+
+	def handle(self, *args, **options):
+		futures = requeue_stale_resumes(timedelta(minutes=options["older_than"]))
+		wait(futures)
+		self.stdout.write(f"Re-ran embedding for {len(futures)} resume(s)")
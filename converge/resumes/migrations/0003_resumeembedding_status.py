@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-15 06:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0002_resumejson'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumeembedding',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('done', 'Done'), ('failed', 'Failed')], default='done', help_text='Embedding generation state; pending/processing while a background task runs', max_length=16),
+        ),
+    ]
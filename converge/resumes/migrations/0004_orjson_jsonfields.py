@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-15 06:49
+
+import converge.orjson_codec
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0003_resumeembedding_status'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='resumeembedding',
+            name='embedding',
+            field=models.JSONField(decoder=converge.orjson_codec.OrjsonDecoder, default=list, encoder=converge.orjson_codec.OrjsonEncoder, help_text='768-dim embedding vector'),
+        ),
+        migrations.AlterField(
+            model_name='resumejson',
+            name='resume_json',
+            field=models.JSONField(decoder=converge.orjson_codec.OrjsonDecoder, default=dict, encoder=converge.orjson_codec.OrjsonEncoder, help_text='Canonical resume JSON payload'),
+        ),
+    ]
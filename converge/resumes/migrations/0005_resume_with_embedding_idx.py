@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-15 06:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0004_orjson_jsonfields'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='resumeembedding',
+            index=models.Index(condition=models.Q(('embedding', []), _negated=True), fields=['resume_id'], name='resume_with_embedding_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-15 06:50
+
+import pgvector.django.indexes
+import pgvector.django.vector
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0005_resume_with_embedding_idx'),
+    ]
+
+    # State only: the pgvector column is opt-in and lives in the resume_vectors app
+    # (MATCH_USE_PGVECTOR), so migrating never requires the vector extension
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name='resumeembedding',
+                    name='embedding_vec',
+                    field=pgvector.django.vector.VectorField(blank=True, dimensions=768, help_text='pgvector copy of embedding for in-database cosine search', null=True),
+                ),
+                migrations.AddIndex(
+                    model_name='resumeembedding',
+                    index=pgvector.django.indexes.HnswIndex(ef_construction=64, fields=['embedding_vec'], m=16, name='resume_hnsw', opclasses=['vector_cosine_ops']),
+                ),
+            ],
+        ),
+    ]
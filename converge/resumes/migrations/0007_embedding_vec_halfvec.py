@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-15 06:52
+
+import pgvector.django.halfvec
+import pgvector.django.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0006_resumeembedding_embedding_vec'),
+    ]
+
+    # State only, like 0006; see resume_vectors for the pgvector column
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RemoveIndex(
+                    model_name='resumeembedding',
+                    name='resume_hnsw',
+                ),
+                migrations.AlterField(
+                    model_name='resumeembedding',
+                    name='embedding_vec',
+                    field=pgvector.django.halfvec.HalfVectorField(blank=True, dimensions=768, help_text='Half-precision pgvector copy of embedding for in-database cosine search', null=True),
+                ),
+                migrations.AddIndex(
+                    model_name='resumeembedding',
+                    index=pgvector.django.indexes.HnswIndex(ef_construction=64, fields=['embedding_vec'], m=16, name='resume_hnsw', opclasses=['halfvec_cosine_ops']),
+                ),
+            ],
+        ),
+    ]
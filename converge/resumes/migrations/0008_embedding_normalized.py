@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-15 06:58
+
+import numpy as np
+from django.db import migrations, models
+
+
+def _unit_vector(embedding):
+    # Frozen copy of external.embedding_store.unit_vector so this migration never drifts with app code
+    matrix = np.array(embedding, dtype=np.float32).reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms)[0]
+
+
+def normalize_existing(apps, schema_editor):
+    # Rewrite stored embeddings at unit length so matching can skip per-request normalization
+    Model = apps.get_model('resumes', 'ResumeEmbedding')
+    batch = []
+    for row in Model.objects.exclude(embedding=[]).only('id', 'embedding').iterator(chunk_size=500):
+        row.embedding = _unit_vector(row.embedding).tolist()
+        row.normalized = True
+        batch.append(row)
+        if len(batch) >= 500:
+            Model.objects.bulk_update(batch, ['embedding', 'normalized'])
+            batch = []
+    if batch:
+        Model.objects.bulk_update(batch, ['embedding', 'normalized'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0007_embedding_vec_halfvec'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumeembedding',
+            name='normalized',
+            field=models.BooleanField(default=False, help_text='embedding is stored L2-normalized (unit length)'),
+        ),
+        migrations.RunPython(normalize_existing, migrations.RunPython.noop),
+    ]
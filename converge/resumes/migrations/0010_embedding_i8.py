@@ -0,0 +1,54 @@
+# Generated by Django 5.2.7 on 2026-10-15 07:08
+
+import numpy as np
+from django.db import migrations, models
+
+
+def _unit_vector(embedding):
+    # Frozen copy of external.embedding_store.unit_vector so this migration never drifts with app code
+    matrix = np.array(embedding, dtype=np.float32).reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms)[0]
+
+
+def quantize_existing(apps, schema_editor):
+    # Symmetric per-row int8 quantization of the unit-length embeddings, as resumes.tasks stores them
+    Model = apps.get_model('resumes', 'ResumeEmbedding')
+    batch = []
+    for row in Model.objects.exclude(embedding=[]).only('id', 'embedding', 'embedding_f32').iterator(chunk_size=500):
+        if row.embedding_f32:
+            vector = np.frombuffer(row.embedding_f32, dtype=np.float32)
+        else:
+            vector = _unit_vector(row.embedding)
+        # Symmetric quantization, vector ≈ q * scale; an all-zero vector keeps scale 1.0
+        scale = np.float32(np.abs(vector).max() / 127.0) or np.float32(1.0)
+        row.embedding_i8 = np.round(vector / scale).astype(np.int8).tobytes()
+        row.embedding_scale = float(scale)
+        batch.append(row)
+        if len(batch) >= 500:
+            Model.objects.bulk_update(batch, ['embedding_i8', 'embedding_scale'])
+            batch = []
+    if batch:
+        Model.objects.bulk_update(batch, ['embedding_i8', 'embedding_scale'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0009_embedding_f32'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumeembedding',
+            name='embedding_i8',
+            field=models.BinaryField(blank=True, help_text='Unit-length embedding quantized to packed int8 bytes (≈ embedding_i8 * embedding_scale)', null=True),
+        ),
+        migrations.AddField(
+            model_name='resumeembedding',
+            name='embedding_scale',
+            field=models.FloatField(blank=True, help_text='Dequantization scale for embedding_i8', null=True),
+        ),
+        migrations.RunPython(quantize_existing, migrations.RunPython.noop),
+    ]
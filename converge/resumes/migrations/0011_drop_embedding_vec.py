@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-15 07:30
+
+from django.db import migrations
+
+
+def drop_embedding_vec(apps, schema_editor):
+    # 0006/0007 no longer touch the database; only databases migrated before that
+    # change have the column (and its HNSW index), which moved to resume_vectors
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        columns = {column.name for column in connection.introspection.get_table_description(cursor, 'resume_embeddings')}
+    if 'embedding_vec' in columns:
+        schema_editor.execute('DROP INDEX IF EXISTS resume_hnsw')
+        schema_editor.execute('ALTER TABLE resume_embeddings DROP COLUMN embedding_vec')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0010_embedding_i8'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(drop_embedding_vec, migrations.RunPython.noop),
+            ],
+            state_operations=[
+                migrations.RemoveIndex(
+                    model_name='resumeembedding',
+                    name='resume_hnsw',
+                ),
+                migrations.RemoveField(
+                    model_name='resumeembedding',
+                    name='embedding_vec',
+                ),
+            ],
+        ),
+    ]
@@ -1,4 +1,12 @@
 from django.db import models
+from django.db.models import Q
+from converge.orjson_codec import OrjsonDecoder, OrjsonEncoder
+
+
+class ResumeEmbeddingQuerySet(models.QuerySet):
+	def with_embedding(self):
+		"""Rows whose embedding has been generated; matches resume_with_embedding_idx's predicate."""
+		return self.exclude(embedding=[])
 
 
 class ResumeEmbedding(models.Model):
@@ -6,16 +14,36 @@ class ResumeEmbedding(models.Model):
 	Stores embeddings for resumes parsed by Spring Boot backend.
 	Django generates semantic_text + embedding from parsed JSON.
 	"""
+	class Status(models.TextChoices):
+		PENDING = "pending"
+		PROCESSING = "processing"
+		DONE = "done"
+		FAILED = "failed"
+
 	resume_id = models.IntegerField(unique=True, db_index=True, help_text="Foreign key to Spring Boot resume table")
 	semantic_text = models.TextField(blank=True, help_text="Reduced semantic representation")
-	embedding = models.JSONField(default=list, help_text="768-dim embedding vector")
+	embedding = models.JSONField(default=list, encoder=OrjsonEncoder, decoder=OrjsonDecoder, help_text="768-dim embedding vector")
+	normalized = models.BooleanField(default=False, help_text="embedding is stored L2-normalized (unit length)")
+	embedding_f32 = models.BinaryField(null=True, blank=True, help_text="Unit-length embedding as packed float32 bytes")
+	embedding_i8 = models.BinaryField(null=True, blank=True, help_text="Unit-length embedding quantized to packed int8 bytes (≈ embedding_i8 * embedding_scale)")
+	embedding_scale = models.FloatField(null=True, blank=True, help_text="Dequantization scale for embedding_i8")
+	status = models.CharField(
+		max_length=16,
+		choices=Status.choices,
+		default=Status.DONE,
+		help_text="Embedding generation state; pending/processing while a background task runs"
+	)
 	created_at = models.DateTimeField(auto_now_add=True)
 	updated_at = models.DateTimeField(auto_now=True)
 
+	objects = ResumeEmbeddingQuerySet.as_manager()
+
 	class Meta:
 		db_table = "resume_embeddings"
 		indexes = [
 			models.Index(fields=['resume_id']),
+			# Matching scans only embedded resumes; rows still at the default [] are skipped
+			models.Index(fields=['resume_id'], name='resume_with_embedding_idx', condition=~Q(embedding=[])),
 		]
 
 	def __str__(self):
@@ -28,7 +56,7 @@ class ResumeJSON(models.Model):
 	Used for downstream matching without depending on shared DB access.
 	"""
 	resume_id = models.IntegerField(unique=True, db_index=True, help_text="Foreign key to Spring Boot resume table")
-	resume_json = models.JSONField(default=dict, help_text="Canonical resume JSON payload")
+	resume_json = models.JSONField(default=dict, encoder=OrjsonEncoder, decoder=OrjsonDecoder, help_text="Canonical resume JSON payload")
 	created_at = models.DateTimeField(auto_now_add=True)
 	updated_at = models.DateTimeField(auto_now=True)
 
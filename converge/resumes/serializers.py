@@ -6,8 +6,8 @@ class ResumeEmbeddingSerializer(serializers.ModelSerializer):
 	"""Output with embedding data"""
 	class Meta:
 		model = ResumeEmbedding
-		fields = ['resume_id', 'semantic_text', 'embedding', 'created_at', 'updated_at']
-		read_only_fields = ['created_at', 'updated_at']
+		fields = ['resume_id', 'semantic_text', 'embedding', 'status', 'created_at', 'updated_at']
+		read_only_fields = ['status', 'created_at', 'updated_at']
 
 
 class ResumeJSONInputSerializer(serializers.Serializer):
@@ -15,6 +15,8 @@ class ResumeJSONInputSerializer(serializers.Serializer):
 	resume_id = serializers.IntegerField(required=True)
 	resume_json = serializers.JSONField(required=False)
 	parsed_json = serializers.JSONField(required=False)
+	background = serializers.BooleanField(required=False, default=False)
+	merge = serializers.BooleanField(required=False, default=False)
 
 	def validate(self, attrs):
 		# Allow either resume_json or parsed_json; prefer resume_json if both.
@@ -0,0 +1,101 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from converge.match_cache import invalidate_all_matches
+from .models import ResumeEmbedding, ResumeJSON
+from external.semantic import build_semantic_text
+from external.embed_resume import embed_semantic_text
+from external.embedding_store import normalize_rows, pack_embedding, quantize_rows
+
+# Resume embedding runs on a small in-process pool so the HTTP response does not wait on Gemini.
+# Jobs live only in the worker's memory: delivery is at-most-once, and a restart or deploy
+# drops queued jobs. requeue_stale_resumes (manage.py requeue_resume_embeddings) re-runs them.
+RESUME_TASK_WORKERS = 4
+STALE_TASK_AFTER = timedelta(minutes=15)  # pending/processing longer than this is presumed dropped
+MAX_RETRIES = 5
+RETRY_BACKOFF = 2  # seconds, doubled after each failed attempt
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=RESUME_TASK_WORKERS, thread_name_prefix="resume-task")
+
+
+def embed_resume_record(resume_id, resume_json):
+	"""Build semantic text + embedding for a resume and store it. Returns (ResumeEmbedding, created)."""
+	semantic_text = build_semantic_text(resume_json)
+	# Stored at unit length so matching can score with plain dot products
+	embedding = normalize_rows(embed_semantic_text(semantic_text)[None, :])[0]
+	embedding_q, embedding_scale = quantize_rows(embedding)
+
+	with transaction.atomic():
+		record = ResumeEmbedding.objects.update_or_create(
+			resume_id=resume_id,
+			defaults={
+				"semantic_text": semantic_text,
+				"embedding": embedding.tolist(),
+				"embedding_f32": pack_embedding(embedding),
+				"embedding_i8": embedding_q[0].tobytes(),
+				"embedding_scale": float(embedding_scale[0]),
+				"normalized": True,
+				"status": ResumeEmbedding.Status.DONE,
+			}
+		)
+		if settings.MATCH_USE_PGVECTOR:
+			# resume_vectors is only installed when pgvector matching is on
+			from resume_vectors.models import ResumeVector
+			ResumeVector.objects.update_or_create(resume_id=resume_id, defaults={"embedding_vec": embedding})
+	invalidate_all_matches()
+	return record
+
+
+def process_resume_task(resume_id):
+	"""Embed the stored ResumeJSON for resume_id, retrying with exponential backoff."""
+	close_old_connections()
+	try:
+		for attempt in range(1, MAX_RETRIES + 1):
+			try:
+				ResumeEmbedding.objects.filter(resume_id=resume_id).update(
+					status=ResumeEmbedding.Status.PROCESSING, updated_at=timezone.now()
+				)
+				resume_json = ResumeJSON.objects.get(resume_id=resume_id).resume_json
+				embed_resume_record(resume_id, resume_json)
+				logger.info(f"[resumes] Background embedding done for resume_id={resume_id}")
+				return
+			except ResumeJSON.DoesNotExist:
+				logger.warning(f"[resumes] resume_id={resume_id} has no stored JSON, nothing to embed")
+				break
+			except Exception as e:
+				logger.warning(f"[resumes] Embedding attempt {attempt}/{MAX_RETRIES} failed for resume_id={resume_id}: {e}")
+				if attempt < MAX_RETRIES:
+					time.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+
+		ResumeEmbedding.objects.filter(resume_id=resume_id).update(
+			status=ResumeEmbedding.Status.FAILED, updated_at=timezone.now()
+		)
+	finally:
+		close_old_connections()
+
+
+def enqueue_resume_processing(resume_id):
+	"""Schedule process_resume_task once the current transaction commits."""
+	transaction.on_commit(lambda: _executor.submit(process_resume_task, resume_id))
+
+
+def requeue_stale_resumes(older_than=STALE_TASK_AFTER):
+	"""
+	Resubmit embedding for resumes stuck pending/processing for longer than older_than,
+	i.e. whose job was dropped with a worker. Returns the submitted futures.
+	"""
+	stale_ids = list(
+		ResumeEmbedding.objects.filter(
+			status__in=[ResumeEmbedding.Status.PENDING, ResumeEmbedding.Status.PROCESSING],
+			updated_at__lt=timezone.now() - older_than,
+		).values_list("resume_id", flat=True)
+	)
+	if stale_ids:
+		logger.info(f"[resumes] Re-queueing {len(stale_ids)} stale embedding job(s): {stale_ids}")
+	return [_executor.submit(process_resume_task, resume_id) for resume_id in stale_ids]
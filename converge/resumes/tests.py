@@ -1,3 +1,131 @@
+from datetime import timedelta
+from unittest import mock, skipUnless
+import numpy as np
+from django.db import connection
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from .models import ResumeEmbedding, ResumeJSON
+from . import tasks
+from .views import _merge_resume_json
 
-# Create your tests here.
+RESUME = {"name": "Ada", "skills": {"languages": ["Python", "SQL"], "frameworks": ["Django"]}}
+
+
+def _fake_embedding(semantic_text):
+	return np.ones(768, dtype=np.float32)
+
+
+# Tasks run inline here: close_old_connections would drop the test transaction,
+# and the executor would run them on another thread (and connection)
+@mock.patch.object(tasks, "close_old_connections")
+@mock.patch.object(tasks._executor, "submit", side_effect=lambda fn, *args: fn(*args))
+class ResumeTaskStatusTests(TestCase):
+	def setUp(self):
+		self.client = APIClient()
+
+	def _post(self, **body):
+		return self.client.post("/api/resume/json/", {"resume_id": 1, **body}, format="json")
+
+	def test_background_upsert_goes_pending_processing_done(self, submit, close_old_connections):
+		seen = []
+
+		def embed(semantic_text):
+			seen.append(ResumeEmbedding.objects.get(resume_id=1).status)
+			return _fake_embedding(semantic_text)
+
+		with mock.patch.object(tasks, "embed_semantic_text", side_effect=embed):
+			with self.captureOnCommitCallbacks() as callbacks:
+				response = self._post(resume_json=RESUME, background=True)
+			self.assertEqual(response.status_code, 202)
+			self.assertEqual(self.client.get("/api/resume/1/status/").json()["status"], "pending")
+
+			for callback in callbacks:
+				callback()
+
+		self.assertEqual(seen, [ResumeEmbedding.Status.PROCESSING])
+		record = ResumeEmbedding.objects.get(resume_id=1)
+		self.assertEqual(record.status, ResumeEmbedding.Status.DONE)
+		self.assertTrue(record.normalized)
+		self.assertAlmostEqual(float(np.linalg.norm(record.embedding)), 1.0, places=5)
+
+	@mock.patch.object(tasks, "time")
+	@mock.patch.object(tasks, "embed_semantic_text", side_effect=RuntimeError("quota exceeded"))
+	def test_task_marks_failed_after_retries(self, embed, time, submit, close_old_connections):
+		ResumeJSON.objects.create(resume_id=1, resume_json=RESUME)
+		ResumeEmbedding.objects.create(resume_id=1, status=ResumeEmbedding.Status.PENDING)
+
+		tasks.process_resume_task(1)
+
+		self.assertEqual(embed.call_count, tasks.MAX_RETRIES)
+		self.assertEqual(time.sleep.call_count, tasks.MAX_RETRIES - 1)
+		self.assertEqual(ResumeEmbedding.objects.get(resume_id=1).status, ResumeEmbedding.Status.FAILED)
+
+	def test_requeue_reruns_only_stale_jobs(self, submit, close_old_connections):
+		old = timezone.now() - tasks.STALE_TASK_AFTER - timedelta(minutes=1)
+		for resume_id, job_status in [
+			(1, ResumeEmbedding.Status.PENDING),
+			(2, ResumeEmbedding.Status.PROCESSING),
+			(3, ResumeEmbedding.Status.DONE),
+			(4, ResumeEmbedding.Status.FAILED),
+		]:
+			ResumeJSON.objects.create(resume_id=resume_id, resume_json=RESUME)
+			ResumeEmbedding.objects.create(resume_id=resume_id, status=job_status)
+		ResumeEmbedding.objects.update(updated_at=old)
+		# Queued just now, so not presumed dropped yet
+		ResumeJSON.objects.create(resume_id=5, resume_json=RESUME)
+		ResumeEmbedding.objects.create(resume_id=5, status=ResumeEmbedding.Status.PENDING)
+
+		with mock.patch.object(tasks, "embed_semantic_text", side_effect=_fake_embedding):
+			futures = tasks.requeue_stale_resumes()
+
+		self.assertEqual(len(futures), 2)
+		self.assertEqual(
+			dict(ResumeEmbedding.objects.values_list("resume_id", "status")),
+			{1: "done", 2: "done", 3: "done", 4: "failed", 5: "pending"},
+		)
+
+
+@mock.patch.object(tasks, "embed_semantic_text", side_effect=_fake_embedding)
+class ResumeMergeTests(TestCase):
+	def _merge(self, patch):
+		return APIClient().post(
+			"/api/resume/json/", {"resume_id": 1, "resume_json": patch, "merge": True}, format="json"
+		)
+
+	def test_merge_with_skills_recomputes_skills_norm(self, embed):
+		stored = ResumeJSON(resume_id=1, resume_json={**RESUME, "_skills_norm": ["django", "python", "sql"]})
+		with mock.patch("resumes.views._merge_resume_json", return_value=stored) as merge:
+			self._merge({"skills": {"languages": ["Go"]}})
+
+		self.assertEqual(merge.call_args.args[1]["_skills_norm"], ["go"])
+
+	def test_merge_without_skills_keeps_stored_skills_norm(self, embed):
+		stored = ResumeJSON(resume_id=1, resume_json={**RESUME, "_skills_norm": ["django", "python", "sql"]})
+		with mock.patch("resumes.views._merge_resume_json", return_value=stored) as merge:
+			self._merge({"name": "Ada L."})
+
+		self.assertNotIn("_skills_norm", merge.call_args.args[1])
+
+	def test_merge_of_unknown_resume_stores_the_patch(self, embed):
+		with mock.patch("resumes.views._merge_resume_json", return_value=None):
+			self._merge({"name": "Ada"})
+
+		# No "skills" in the patch, so no _skills_norm either; matching normalizes on the fly
+		self.assertEqual(ResumeJSON.objects.get(resume_id=1).resume_json, {"name": "Ada"})
+		self.assertEqual(ResumeEmbedding.objects.get(resume_id=1).status, ResumeEmbedding.Status.DONE)
+
+
+@skipUnless(connection.vendor == "postgresql", "merge uses jsonb ||")
+class MergeResumeJsonTests(TestCase):
+	def test_top_level_keys_are_replaced_in_the_database(self):
+		ResumeJSON.objects.create(resume_id=1, resume_json={**RESUME, "_skills_norm": ["django", "python", "sql"]})
+
+		record = _merge_resume_json(1, {"skills": {"languages": ["Go"]}, "_skills_norm": ["go"]})
+
+		self.assertEqual(record.resume_json["name"], "Ada")
+		self.assertEqual(record.resume_json["skills"], {"languages": ["Go"]})
+		self.assertEqual(record.resume_json["_skills_norm"], ["go"])
+
+	def test_missing_resume_returns_none(self):
+		self.assertIsNone(_merge_resume_json(1, {"name": "Ada"}))
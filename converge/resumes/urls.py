@@ -5,5 +5,6 @@ app_name = "resumes"
 
 urlpatterns = [
 	path("json/", views.upsert_resume_json, name="upsert-json"),
+	path("<int:resume_id>/status/", views.resume_status, name="status"),
 ]
 
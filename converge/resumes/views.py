@@ -1,14 +1,33 @@
+from django.db import transaction
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
+from converge.match_cache import invalidate_all_matches
+from converge.orjson_codec import OrjsonEncoder
 from .models import ResumeEmbedding, ResumeJSON
 from .serializers import (
 	ResumeEmbeddingSerializer,
 	ResumeJSONInputSerializer,
 	ResumeJSONSerializer,
 )
-from external.semantic import build_semantic_text
-from external.embed_resume import embed_semantic_text
+from .tasks import embed_resume_record, enqueue_resume_processing
+from external.match_users_to_projects import normalize_skills
+
+
+def _merge_resume_json(resume_id, patch):
+	"""
+	Merge top-level keys of patch into the stored resume JSON inside Postgres
+	(jsonb ||), so only the delta is sent and concurrent merges cannot drop each
+	other's keys. Returns the updated record, or None if the resume is not stored yet.
+	"""
+	with transaction.atomic():
+		updated = ResumeJSON.objects.filter(resume_id=resume_id).update(
+			resume_json=RawSQL("resume_json || %s::jsonb", [OrjsonEncoder().encode(patch)]),
+			updated_at=timezone.now()
+		)
+		return ResumeJSON.objects.get(resume_id=resume_id) if updated else None
 
 
 @api_view(['POST'])
@@ -16,11 +35,18 @@ def upsert_resume_json(request):
 	"""
 	Store/update canonical resume JSON and generate/update its embedding in one step.
 	Accepts either `resume_json` or `parsed_json` for convenience.
+	With `"background": true` the JSON is stored and the embedding is generated by a
+	background task; the response is 202 and progress is polled via the status endpoint.
+	With `"merge": true` the payload is a partial document whose top-level keys replace
+	those of the stored JSON (merged in the database); the embedding is regenerated
+	from the merged result.
 
 	POST /api/resume/json/
 	Body: {
 		"resume_id": 123,
-		"resume_json" | "parsed_json": { ... }
+		"resume_json" | "parsed_json": { ... },
+		"background": false,
+		"merge": false
 	}
 	"""
 	input_serializer = ResumeJSONInputSerializer(data=request.data)
@@ -30,24 +56,40 @@ def upsert_resume_json(request):
 
 	resume_id = input_serializer.validated_data['resume_id']
 	resume_json = input_serializer.validated_data['resume_json']
+	# Stored alongside the resume so matching skips per-call skill normalization
+	merge = input_serializer.validated_data['merge']
+	if not merge or "skills" in resume_json:
+		resume_json["_skills_norm"] = normalize_skills(resume_json.get("skills", {}))
 
 	try:
-		resume_record, created = ResumeJSON.objects.update_or_create(
-			resume_id=resume_id,
-			defaults={"resume_json": resume_json}
-		)
+		resume_record = _merge_resume_json(resume_id, resume_json) if merge else None
+		if resume_record is not None:
+			created = False
+			resume_json = resume_record.resume_json
+		else:
+			resume_record, created = ResumeJSON.objects.update_or_create(
+				resume_id=resume_id,
+				defaults={"resume_json": resume_json}
+			)
+		invalidate_all_matches()
 
-		# Generate semantic text and embedding immediately
-		semantic_text = build_semantic_text(resume_json)
-		embedding = embed_semantic_text(semantic_text)
+		if input_serializer.validated_data['background']:
+			ResumeEmbedding.objects.update_or_create(
+				resume_id=resume_id,
+				defaults={"status": ResumeEmbedding.Status.PENDING}
+			)
+			enqueue_resume_processing(resume_id)
+			return Response(
+				{
+					"message": "Resume JSON stored; embedding queued",
+					"json_record": ResumeJSONSerializer(resume_record).data,
+					"status": ResumeEmbedding.Status.PENDING
+				},
+				status=status.HTTP_202_ACCEPTED
+			)
 
-		resume_embedding, emb_created = ResumeEmbedding.objects.update_or_create(
-			resume_id=resume_id,
-			defaults={
-				"semantic_text": semantic_text,
-				"embedding": embedding,
-			}
-		)
+		# Generate semantic text and embedding immediately
+		resume_embedding, emb_created = embed_resume_record(resume_id, resume_json)
 
 		output_serializer = ResumeJSONSerializer(resume_record)
 		embedding_serializer = ResumeEmbeddingSerializer(resume_embedding)
@@ -66,3 +108,18 @@ def upsert_resume_json(request):
 		)
 
 
+@api_view(['GET'])
+def resume_status(request, resume_id):
+	"""
+	Embedding generation status for a resume.
+
+	GET /api/resume/<resume_id>/status/
+	Returns: {"resume_id": 123, "status": "pending|processing|done|failed", "updated_at": ...}
+	"""
+	record = ResumeEmbedding.objects.filter(resume_id=resume_id).values("status", "updated_at").first()
+	if record is None:
+		return Response(
+			{"error": f"Resume {resume_id} not found"},
+			status=status.HTTP_404_NOT_FOUND
+		)
+	return Response({"resume_id": resume_id, **record}, status=status.HTTP_200_OK)